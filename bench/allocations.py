@@ -0,0 +1,122 @@
+"""Heap growth of main.py per handled key event, on the simulator.
+
+Run from the repository root::
+
+    python bench/allocations.py
+
+Boots main.py and warms it up with every kind of event, so caches and
+first-use allocations are out of the way. Then, for each workload, it
+handles the same number of events twice over and compares tracemalloc
+snapshots of memory allocated from lib/ and main.py. The steady state must
+not grow: the script exits non-zero and lists the allocating lines if any
+workload grows the heap. It also checks that main.py turned automatic
+collection off, collects garbage only once the keys are idle, and still
+collects while typing when the heap runs low.
+
+CPython's allocator is not CircuitPython's, so this only catches memory
+that is kept per event (lists or strings that grow). It does not show that
+the key path allocates nothing: a short-lived temporary, such as the slice
+object CircuitPython builds for ``buffer[:] = data``, is freed before the
+next snapshot. Allocations per event are counted on the board instead. Set
+PROFILING in main.py and type "p" on the serial console: the "max B" column
+is the most heap bytes one run of each stage allocated, from
+``gc.mem_alloc`` before and after with automatic collection off, and must
+be 0 for input and every other stage but gc.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+EVENTS = 48
+TAP_INTERVAL_MS = 40
+
+
+def taps(hw, firmware, count):
+    for i in range(count):
+        hw.tap(i % 24, hold_ms=25)
+        hw.run(firmware.scheduler, TAP_INTERVAL_MS)
+
+
+def taps_with_encoder(hw, firmware, count):
+    for i in range(count):
+        hw.tap(i % 24, hold_ms=25)
+        hw.turn(firmware.board.GP17, 2 if i % 4 < 2 else -2)
+        hw.run(firmware.scheduler, TAP_INTERVAL_MS)
+
+
+def taps_with_mode_switch(hw, firmware, count):
+    for i in range(count):
+        hw.tap(i % 24, hold_ms=25)
+        if i % 6 == 0:
+            hw.turn(firmware.board.GP22, 1)
+        hw.run(firmware.scheduler, TAP_INTERVAL_MS)
+
+
+WORKLOADS = (taps, taps_with_encoder, taps_with_mode_switch)
+
+
+def firmware_snapshot():
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces((
+        tracemalloc.Filter(True, os.path.join(sim.LIB, "*")),
+        tracemalloc.Filter(True, os.path.join(sim.ROOT, "main.py")),
+    ))
+
+
+def main():
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware = hw.import_firmware("main")
+    assert not hw.gc_enabled, "automatic collection is still on"
+
+    failures = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for workload in WORKLOADS:
+            workload(hw, firmware, EVENTS)
+        # Garbage left from booting and warming up
+        hw.heap_used += 8192
+        collections = len(hw.gc_collections)
+        tracemalloc.start()
+        results = []
+        for workload in WORKLOADS:
+            workload(hw, firmware, EVENTS)
+            before = firmware_snapshot()
+            workload(hw, firmware, EVENTS)
+            growth = [stat for stat in firmware_snapshot().compare_to(before, "lineno")
+                      if stat.size_diff > 0]
+            results.append((workload.__name__, sum(stat.size_diff for stat in growth)))
+            failures.extend((workload.__name__, stat) for stat in growth)
+        tracemalloc.stop()
+        typing_collections = len(hw.gc_collections) - collections
+
+        collections = len(hw.gc_collections)
+        hw.run(firmware.scheduler, 1000)
+        idle_collections = len(hw.gc_collections) - collections
+
+        hw.heap_used = hw.heap_size - 1024
+        collections = len(hw.gc_collections)
+        taps(hw, firmware, 4)
+        low_memory_collections = len(hw.gc_collections) - collections
+
+    print("{:<24} {:>8} {:>14}".format("workload", "events", "bytes/event"))
+    for name, growth in results:
+        print("{:<24} {:>8} {:>14.2f}".format(name, EVENTS, growth / EVENTS))
+
+    print("Collections while typing: {}, once idle: {}, typing with the heap low: {}".format(
+        typing_collections, idle_collections, low_memory_collections))
+
+    for name, stat in failures:
+        print("GROWTH {}: {}".format(name, stat))
+    assert typing_collections == 0 and idle_collections == 1 and low_memory_collections >= 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Volume steps per detent of the volume encoder at different speeds, on the simulator.
+
+Run from the repository root::
+
+    python bench/encoder_acceleration.py
+
+Boots main.py and turns the volume encoder twenty detents at a steady pace,
+from slow clicks to a fast spin. Reports the volume steps the firmware
+queued, the steps per detent, and how many detents a full 0-100% sweep
+(50 steps) takes at that pace. The old mapping sent one step per detent
+and dropped single detents below its threshold of two. Slow turns must
+stay exactly one step per detent.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+DETENTS = 20
+FULL_SWEEP_STEPS = 50
+PACES_MS = (250, 100, 50, 30, 15, 8, 4)
+
+
+def turn(pace_ms, direction=1):
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware = hw.import_firmware("main")
+        hw.run(firmware.scheduler, 500)
+    queued = []
+    add = firmware.volume_queue.add
+
+    def counting_add(steps):
+        queued.append(steps)
+        return add(steps)
+
+    firmware.volume_queue.add = counting_add
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(DETENTS):
+            hw.turn(firmware.board.GP17, direction)
+            hw.run(firmware.scheduler, pace_ms)
+        hw.run(firmware.scheduler, 200)
+    return sum(queued)
+
+
+def main():
+    print("{:>9} {:>12} {:>7} {:>12} {:>20}".format(
+        "pace ms", "detents/s", "steps", "steps/detent", "detents for 0-100%"))
+    for pace_ms in PACES_MS:
+        steps = turn(pace_ms)
+        assert turn(pace_ms, -1) == -steps
+        per_detent = steps / DETENTS
+        print("{:>9} {:>12.0f} {:>7} {:>12.2f} {:>20.0f}".format(
+            pace_ms, 1000 / pace_ms, steps, per_detent, FULL_SWEEP_STEPS / per_detent))
+        if pace_ms >= 100:
+            assert steps == DETENTS, "slow turns must be 1:1"
+
+
+if __name__ == "__main__":
+    main()
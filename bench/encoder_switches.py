@@ -0,0 +1,55 @@
+"""Play/pause reports per press of the volume encoder's switch, on the simulator.
+
+Run from the repository root::
+
+    python bench/encoder_switches.py
+
+Presses the switch (``keypad.Keys`` key 0) with hold times from a quick tap
+to a second, each with contact bounce in the first few milliseconds, and
+counts the PLAY_PAUSE reports main.py sends. Every press must send exactly
+one, and the time from the scan that saw the press to the report is shown.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+PLAY_PAUSE = b"\xcd\x00"
+HOLDS_MS = (25, 100, 400, 1000)
+BOUNCE_MS = (0, 1, 3)
+
+
+def main():
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware = hw.import_firmware("main")
+    scanner = hw.scanners.index(firmware.encoder_switches)
+
+    print("{:>8} {:>8} {:>10}".format("hold ms", "reports", "latency ms"))
+    for hold_ms in HOLDS_MS:
+        hw.consumer_control.reports.clear()
+        del hw.key_events[:]
+        start_ms = hw.clock.now_ms + 1
+        # Chatter: closed, open, closed again, then held
+        for i, offset_ms in enumerate(BOUNCE_MS):
+            if i % 2:
+                hw.release(0, at_ms=start_ms + offset_ms, scanner=scanner)
+            else:
+                hw.press(0, at_ms=start_ms + offset_ms, scanner=scanner)
+        hw.release(0, at_ms=start_ms + hold_ms, scanner=scanner)
+        with contextlib.redirect_stdout(io.StringIO()):
+            hw.run(firmware.scheduler, hold_ms + 200)
+        sent = [at_ns for at_ns, report in hw.consumer_control.reports if report == PLAY_PAUSE]
+        pressed_ns = [at_ns for at_ns, _, pressed in hw.key_events if pressed]
+        latency_ms = (sent[0] - pressed_ns[0]) / 1e6 if sent and pressed_ns else float("nan")
+        print("{:>8} {:>8} {:>10.1f}".format(hold_ms, len(sent), latency_ms))
+        assert len(sent) == 1, "{} ms hold sent {} reports".format(hold_ms, len(sent))
+
+
+if __name__ == "__main__":
+    main()
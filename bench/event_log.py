@@ -0,0 +1,99 @@
+"""Cost of logging a key event: ``print`` against `event_log.EventLog`.
+
+Run from the repository root::
+
+    python bench/event_log.py
+
+Logs the same key events with the f-string ``print`` main.py used and with
+``EventLog.debug``, with the console going to a fast sink and to one that
+takes 1 ms per write, like a USB CDC console the host is not reading fast.
+Reports the time per event on the key path and the memory allocated per
+event (tracemalloc, net and peak). Then flushes the log and checks that it
+prints the same text. Times are host CPU time, so only the ratios mean
+anything.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+EVENTS = 1000
+CONSOLE_DELAY_S = 0.001
+
+
+class SlowConsole(io.StringIO):
+    def write(self, text):
+        time.sleep(CONSOLE_DELAY_S)
+        return super().write(text)
+
+
+def log_with_print(log, key_number):
+    print(f'Key pressed: {key_number}')
+
+
+def log_with_event_log(log, key_number):
+    log.debug(0, key_number)
+
+
+def measure(method, log, console, events=EVENTS):
+    with contextlib.redirect_stdout(console):
+        start = time.perf_counter()
+        for i in range(events):
+            method(log, i % 24)
+        elapsed = time.perf_counter() - start
+    return elapsed / events * 1e6
+
+
+def allocated(method, log):
+    # Warm up so the measurement does not include first-call caches
+    measure(method, log, io.StringIO(), 10)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(EVENTS):
+            method(log, i % 24)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - before) / EVENTS, peak - before
+
+
+def main():
+    hw = sim.install()
+    hw.import_firmware("event_log")
+    import event_log
+
+    def new_log():
+        return event_log.EventLog(("Key pressed: {}",), capacity=EVENTS)
+
+    print("{:<10} {:>10} {:>14} {:>13} {:>11}".format(
+        "method", "fast us", "slow console us", "net B/event", "peak B"))
+    for name, method in (("print", log_with_print), ("EventLog", log_with_event_log)):
+        fast = measure(method, new_log(), io.StringIO())
+        slow = measure(method, new_log(), SlowConsole(), events=100)
+        net, peak = allocated(method, new_log())
+        print("{:<10} {:>10.2f} {:>14.1f} {:>13.1f} {:>11}".format(name, fast, slow, net, peak))
+
+    log = new_log()
+    for key_number in range(24):
+        log.debug(0, key_number)
+    hw.clock.advance_ms(log.quiet_ms)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        printed = log.flush()
+    assert printed == 24, printed
+    lines = output.getvalue().splitlines()
+    assert [line.split(None, 2)[2] for line in lines] == \
+        ["Key pressed: {}".format(key_number) for key_number in range(24)], lines
+    print("Flushed {} records, e.g. {!r}".format(printed, lines[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""CPython benchmark: reports per second for ``Keyboard.press`` vs. prebuilt reports.
+
+Run from the repository root::
+
+    python bench/hid_reports.py
+
+Each iteration presses one binding and releases all keys, i.e. two reports,
+against a device whose ``send_report`` only counts.
+"""
+
+import time
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+sim.install()
+
+import keymaps  # noqa: E402
+from keymap import Keymap, ReportKeyboard  # noqa: E402
+
+
+class CountingDevice:
+    """Keyboard HID device that only counts reports."""
+
+    usage_page = 0x01
+    usage = 0x06
+
+    def __init__(self):
+        self.reports = 0
+
+    def send_report(self, report):
+        self.reports += 1
+
+
+def rate(kbd, device, press, actions, seconds):
+    device.reports = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for action in actions:
+            press(action)
+            kbd.release_all()
+    return device.reports / (time.perf_counter() - start)
+
+
+def main(seconds=1.0):
+    keymap = Keymap(keymaps.MODES, keymaps.NUM_KEYS)
+    device = CountingDevice()
+    kbd = ReportKeyboard(device)
+    for mode in range(len(keymap)):
+        actions = [keymap.lookup(mode, key) for key in range(keymap.num_keys)]
+        actions = [action for action in actions if action is not None]
+        before = rate(kbd, device, lambda action: kbd.press(*action.keycodes), actions, seconds)
+        after = rate(kbd, device, lambda action: action.press(kbd), actions, seconds)
+        print("{:>8}: Keyboard.press {:>10.0f} reports/s, prebuilt {:>10.0f} reports/s ({:.2f}x)".format(
+            keymap.names[mode], before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
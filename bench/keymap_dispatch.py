@@ -0,0 +1,87 @@
+"""CPython microbenchmark: keymap table lookup vs. the old if/elif chain.
+
+Run from the repository root::
+
+    python bench/keymap_dispatch.py
+
+The legacy ``handle_key_press`` is rebuilt from the same bindings as a
+literal per-mode if/elif chain with a ``print`` before each press, which is
+how main.py dispatched keys before the keymap engine.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+sim.install()
+
+import keymaps  # noqa: E402
+from keymap import Keymap  # noqa: E402
+
+
+class NullKeyboard:
+    """Stands in for ``ReportKeyboard``; counts presses instead of sending reports."""
+
+    def __init__(self):
+        self.presses = 0
+
+    def press(self, *keycodes):
+        self.presses += 1
+
+    def press_report(self, report, keycodes):
+        self.presses += 1
+
+
+class NullWriter:
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+def build_legacy_chain():
+    """Generate the old per-mode if/elif ``handle_key_press``."""
+    lines = ["def handle_key_press(kbd, current_mode, key_number):"]
+    for mode, (_, bindings) in enumerate(keymaps.MODES):
+        lines.append("    {} current_mode == {}:".format("if" if mode == 0 else "elif", mode))
+        for key_number, (label, keycodes) in enumerate(bindings):
+            lines.append("        {} key_number == {}:".format("if" if key_number == 0 else "elif", key_number))
+            lines.append("            print({!r})".format("Typing '{}'".format(label)))
+            lines.append("            kbd.press({})".format(", ".join(str(k) for k in keycodes)))
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["handle_key_press"]
+
+
+def main(number=20000):
+    legacy = build_legacy_chain()
+    keymap = Keymap(keymaps.MODES, keymaps.NUM_KEYS)
+    kbd = NullKeyboard()
+
+    def table(mode, key_number):
+        action = keymap.lookup(mode, key_number)
+        if action is not None:
+            action.press(kbd)
+
+    stdout = sys.stdout
+    print("{:>6} {:>4} {:>14} {:>14} {:>8}".format("mode", "key", "chain ns", "table ns", "speedup"))
+    for mode in range(len(keymap)):
+        for key_number in (0, 11, 23):
+            sys.stdout = NullWriter()
+            try:
+                chain_s = timeit.timeit(lambda: legacy(kbd, mode, key_number), number=number)
+            finally:
+                sys.stdout = stdout
+            table_s = timeit.timeit(lambda: table(mode, key_number), number=number)
+            print("{:>6} {:>4} {:>14.1f} {:>14.1f} {:>7.1f}x".format(
+                keymap.names[mode], key_number,
+                chain_s / number * 1e9, table_s / number * 1e9, chain_s / table_s))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Keypress-to-HID-report latency benchmarks on the simulator.
+
+Run from the repository root::
+
+    python bench/latency.py                    # compare against the baseline
+    python bench/latency.py --update-baseline  # record a new baseline
+
+Each workload boots main.py against the simulated board and scripts key
+taps alongside LCD, encoder or mode-switch activity. Latency runs from the
+key matrix scan that queued a press event to the ``send_report`` carrying
+that press, in virtual time. On the board the matrix is scanned in the
+background, at any point of the firmware's millisecond ticks, so each
+workload is run with the scans moved to a sweep of phases across the 20 ms
+scan interval and off the tick boundaries, and the latencies of all runs
+are pooled. Results are compared against latency_baseline.json and the
+script exits non-zero on a regression.
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sim  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "latency_baseline.json")
+
+DURATION_MS = 3000
+TAP_INTERVAL_MS = 50
+HOLD_MS = 25
+
+# Delays of the key matrix scans: off the millisecond ticks, and across the
+# whole scan interval, at steps that vary the offset within a tick
+SCAN_PHASES_US = range(100, 20000, 730)
+
+# A regression is a p99 or max this much worse than the baseline
+TOLERANCE = 0.10
+SLACK_MS = 0.5
+
+
+def script_taps(hw, rng, start_ms, interval_ms=TAP_INTERVAL_MS, chord=1):
+    """Schedule taps of random keys every ``interval_ms``, ``chord`` at a time."""
+    at_ms = start_ms
+    while at_ms < start_ms + DURATION_MS - interval_ms:
+        for key_number in rng.sample(range(24), chord):
+            hw.tap(key_number, at_ms=at_ms, hold_ms=HOLD_MS)
+        at_ms += interval_ms
+
+
+def typing(hw, main, rng, start_ms):
+    """Steady typing with an unchanging screen."""
+    script_taps(hw, rng, start_ms)
+
+
+def lcd_activity(hw, main, rng, start_ms):
+    """Typing while the encoder value on the LCD changes every frame."""
+    script_taps(hw, rng, start_ms)
+    return [(at_ms, main.board.GP17, rng.choice((-1, 1)))
+            for at_ms in range(start_ms, start_ms + DURATION_MS, 100)]
+
+
+def encoder_spin(hw, main, rng, start_ms):
+    """Typing while the volume encoder is spun fast in bursts."""
+    script_taps(hw, rng, start_ms)
+    return [(at_ms, main.board.GP17, 1 if (at_ms // 500) % 2 else -1)
+            for at_ms in range(start_ms, start_ms + DURATION_MS, 10)]
+
+
+def mode_switch(hw, main, rng, start_ms):
+    """Typing while the mode encoder switches modes four times a second."""
+    script_taps(hw, rng, start_ms)
+    return [(at_ms, main.board.GP22, 1)
+            for at_ms in range(start_ms, start_ms + DURATION_MS, 250)]
+
+
+def burst(hw, main, rng, start_ms):
+    """Chords of eight keys every 200 ms."""
+    script_taps(hw, rng, start_ms, interval_ms=200, chord=8)
+
+
+WORKLOADS = (typing, lcd_activity, encoder_spin, mode_switch, burst)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_key_presses(hw, main):
+    """Time each press main.py handles from the scan that queued its event to
+    the report it sent. Returns a list that collects the latencies in ms as
+    the simulation runs.
+
+    The scan time is the nanosecond one the simulator records in
+    ``hw.key_events``, not the event's ``timestamp``, which is truncated to
+    whole milliseconds."""
+    latencies = []
+    handle_key_press = main.handle_key_press
+    # Events are handled in the order they were queued: the next press of
+    # the key from here on is the one being handled
+    cursor = [0]
+
+    def timed_handle_key_press(key_number):
+        events = hw.key_events
+        index = cursor[0]
+        while not (events[index][1] == key_number and events[index][2]):
+            index += 1
+        cursor[0] = index + 1
+        count = len(hw.keyboard.reports)
+        handle_key_press(key_number)
+        if len(hw.keyboard.reports) > count:
+            latencies.append((hw.keyboard.reports[count][0] - events[index][0]) / 1e6)
+
+    main.handle_key_press = timed_handle_key_press
+    return latencies
+
+
+def run(workload, seed=1):
+    """Run ``workload`` at every scan phase and pool the results."""
+    latencies = []
+    reports = i2c_bytes = 0
+    for phase_us in SCAN_PHASES_US:
+        hw, phase_latencies = run_phase(workload, phase_us, seed)
+        latencies.extend(phase_latencies)
+        reports += len(hw.keyboard.reports)
+        i2c_bytes += sum(bus.bytes_written for bus in hw.i2c_buses)
+    runs = len(SCAN_PHASES_US)
+    return {
+        "presses": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "reports_per_s": round(reports / runs / (DURATION_MS / 1000), 1),
+        "i2c_bytes": round(i2c_bytes / runs),
+    }
+
+
+def run_phase(workload, phase_us, seed):
+    """Run ``workload`` once with the scans delayed by ``phase_us``. Returns
+    the hardware and the press latencies."""
+    hw = sim.install()
+    main = hw.import_firmware("main")
+    hw.scanners[0].delay_scans(phase_us * 1000)
+    rng = random.Random(seed)
+    start_ms = hw.clock.now_ms + 1
+    turns = workload(hw, main, rng, start_ms) or []
+    hw.keyboard.reports.clear()
+    del hw.key_events[:]
+
+    latencies = time_key_presses(hw, main)
+
+    end_ms = start_ms + DURATION_MS
+    while hw.clock.now_ms < end_ms:
+        now_ms = hw.clock.now_ms
+        while turns and turns[0][0] <= now_ms:
+            _, pin, detents = turns.pop(0)
+            hw.turn(pin, detents)
+        main.scheduler.run_due(now_ms)
+        hw.clock.set_ms(now_ms + 1)
+    return hw, latencies
+
+
+def main(argv):
+    results = {}
+    print("{:<14} {:>7} {:>9} {:>9} {:>9} {:>10} {:>10}".format(
+        "workload", "presses", "p50 ms", "p99 ms", "max ms", "reports/s", "I2C bytes"))
+    for workload in WORKLOADS:
+        # The firmware's console output is not part of the measurement
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = results[workload.__name__] = run(workload)
+        print("{:<14} {presses:>7} {p50_ms:>9.3f} {p99_ms:>9.3f} {max_ms:>9.3f} "
+              "{reports_per_s:>10.1f} {i2c_bytes:>10}".format(workload.__name__, **result))
+
+    if "--update-baseline" in argv:
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Baseline written to {}".format(BASELINE))
+        return 0
+
+    if not os.path.exists(BASELINE):
+        print("No baseline; run with --update-baseline to record one.")
+        return 0
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    failures = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ("p99_ms", "max_ms"):
+            limit = baseline[name][metric] * (1 + TOLERANCE) + SLACK_MS
+            if result[metric] > limit:
+                failures.append("{} {}: {:.3f} > {:.3f}".format(name, metric, result[metric], limit))
+    for failure in failures:
+        print("REGRESSION " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,71 @@
+"""Boot-to-first-frame time for the LCD, cold and after a soft reload.
+
+Run from the repository root::
+
+    python bench/lcd_boot.py
+
+Boots main.py on a freshly powered simulated board, then imports it again on
+the same board the way a soft reload (Ctrl-D or a file save) restarts the
+firmware while the LCD keeps power. Each boot is timed in virtual time from
+the start of the import until the LCD is initialized with the boot splash
+shown (ready), and until the first "Mode:" frame is on the screen, with the
+LCD's warm start on (as main.py ships) and forced off. The first frame also
+waits for the display task's cadence.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+TIMEOUT_MS = 1000
+
+
+def boot(hw, warm_start):
+    """Import main.py on ``hw`` and return (ms to ready, ms to first frame,
+    I2C bytes)."""
+    lcd = hw.import_firmware("lcd")
+    if not warm_start:
+        init = lcd.LCD.__init__
+
+        def cold_init(self, *args, warm_start=False, **kwargs):
+            init(self, *args, **kwargs)
+
+        lcd.LCD.__init__ = cold_init
+
+    start_ns = hw.clock.now_ns
+    bytes_before = sum(bus.bytes_written for bus in hw.i2c_buses)
+    with contextlib.redirect_stdout(io.StringIO()):
+        main = hw.import_firmware("main", purge=False)
+        while not main.display.idle:
+            hw.run(main.scheduler, 1)
+        ready_ms = (hw.clock.now_ns - start_ns) / 1e6
+        # The screen may still show the previous boot's frame until the
+        # firmware's own queue has drained
+        while not (main.display.idle and hw.lcd.lines()[0].startswith("Mode:")):
+            if hw.clock.now_ns - start_ns > TIMEOUT_MS * 1000000:
+                raise RuntimeError("No frame after {} ms: {}".format(TIMEOUT_MS, hw.lcd.lines()))
+            hw.run(main.scheduler, 1)
+    first_ms = (hw.clock.now_ns - start_ns) / 1e6
+    return ready_ms, first_ms, sum(bus.bytes_written for bus in hw.i2c_buses) - bytes_before
+
+
+def main():
+    print("{:<10} {:<12} {:>9} {:>9} {:>10} {:>10}".format(
+        "warm start", "boot", "ready ms", "first ms", "I2C bytes", "violations"))
+    for warm_start in (False, True):
+        hw = sim.install()
+        for name in ("power on", "soft reload"):
+            ready_ms, first_ms, i2c_bytes = boot(hw, warm_start)
+            print("{:<10} {:<12} {:>9.2f} {:>9.2f} {:>10} {:>10}".format(
+                "on" if warm_start else "off", name, ready_ms, first_ms, i2c_bytes,
+                hw.lcd.controller.busy_violations))
+    print("Screen after the last boot: {}".format(hw.lcd.lines()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Fixed delays vs. busy-flag polling for blocking LCD operations.
+
+Run from the repository root::
+
+    python bench/lcd_busy_flag.py
+
+Initializes the LCD and runs clear/print/home cycles against emulated
+controllers that are faster or slower than the datasheet. It reports
+throughput, commands the controller received while still busy (which a
+real display would drop), and status reads.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+CYCLES = 20
+
+
+def run(frequency, time_scale, read_busy):
+    hw = sim.install(lcd_time_scale=time_scale)
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0, frequency=frequency)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(
+        i2c, 0x27, read_busy=read_busy, frequency=frequency)
+    start_ns = hw.clock.now_ns
+    display = lcd.LCD(interface, num_rows=2, num_cols=16)
+    for cycle in range(CYCLES):
+        display.clear()
+        display.print("Cycle {:<10}".format(cycle))
+        display.home()
+    seconds = (hw.clock.now_ns - start_ns) / 1e9
+    assert hw.lcd.lines()[0].startswith("Cycle {}".format(CYCLES - 1)) or hw.lcd.controller.busy_violations
+    return CYCLES / seconds, hw.lcd.controller.busy_violations, hw.lcd.reads, interface.read_busy
+
+
+def main():
+    print("{:>5} {:>6} {:<8} {:>9} {:>11} {:>12} {:>10}".format(
+        "kHz", "speed", "mode", "cycles/s", "violations", "status reads", "read-back"))
+    for frequency in (100000, 400000):
+        for time_scale in (0.7, 1.0, 1.4):
+            for read_busy in (False, True):
+                print("{:>5} {:>6.1f} {:<8} {:>9.1f} {:>11} {:>12} {:>10}".format(
+                    frequency // 1000, time_scale, "poll" if read_busy else "fixed",
+                    *run(frequency, time_scale, read_busy)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""CGRAM traffic for custom glyphs on the simulator.
+
+Run from the repository root::
+
+    python bench/lcd_glyphs.py
+
+Animates a 16x2 screen with a volume bar, a mode icon and a die face drawn
+from 14 glyphs, at most 8 per frame. Uploading every glyph a frame uses with
+``create_char`` is compared against `lcd_glyphs.GlyphManager`, and every
+frame is checked against the emulated controller's DDRAM and CGRAM.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+FRAMES = 200
+
+
+def bar(level):
+    """Volume bar cell filled ``level`` pixels from the left (0-5)."""
+    row = (0b11111 << (5 - level)) & 0b11111
+    return bytes((0, row, row, row, row, row, row, 0))
+
+
+def die(face):
+    pips = {1: (4,), 2: (0, 8), 3: (0, 4, 8), 4: (0, 2, 6, 8),
+            5: (0, 2, 4, 6, 8), 6: (0, 2, 3, 5, 6, 8)}[face]
+    rows = bytearray(8)
+    for pip in pips:
+        row, col = divmod(pip, 3)
+        rows[1 + row * 3] |= 0b10000 >> col * 2
+    return bytes(rows)
+
+
+GLYPHS = {"bar{}".format(level): bar(level) for level in range(6)}
+GLYPHS.update(("die{}".format(face), die(face)) for face in range(1, 7))
+GLYPHS["blender"] = bytes((0, 0b00100, 0b01110, 0b11111, 0b01110, 0b00100, 0, 0))
+GLYPHS["krita"] = bytes((0, 0b10001, 0b01010, 0b00100, 0b01010, 0b10001, 0, 0))
+
+
+def frames(seed=1):
+    """(glyph names per row) for each frame: a volume bar that drifts, a
+    mode icon that changes now and then and a die that is rolled."""
+    rng = random.Random(seed)
+    volume, mode, face = 40, "blender", 1
+    for frame in range(FRAMES):
+        volume = max(0, min(50, volume + rng.choice((-3, -1, 0, 1, 3))))
+        if frame % 50 == 49:
+            mode = "krita" if mode == "blender" else "blender"
+        if frame % 10 == 0:
+            face = rng.randint(1, 6)
+        cells = ["bar{}".format(max(0, min(5, volume - 5 * i))) for i in range(10)]
+        yield ([mode, "die{}".format(face)], cells)
+
+
+def make_display():
+    hw = sim.install()
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27)
+    return hw, lcd.LCD(interface, num_rows=2, num_cols=16), i2c
+
+
+def check(hw, rows):
+    controller = hw.lcd.controller
+    for line, names in zip(hw.lcd.lines(), rows):
+        for cell, name in zip(line, names):
+            slot = ord(cell)
+            assert slot < 8, line
+            assert bytes(controller.cgram[slot * 8:slot * 8 + 8]) == GLYPHS[name], name
+
+
+def create_char_per_frame():
+    hw, display, i2c = make_display()
+    for rows in frames():
+        slots = {}
+        for names in rows:
+            for name in names:
+                if name not in slots:
+                    slots[name] = len(slots)
+                    display.create_char(slots[name], GLYPHS[name])
+        display.render(["".join(chr(slots[name]) for name in names) for names in rows])
+        check(hw, rows)
+    return hw, i2c
+
+
+def glyph_manager():
+    hw, display, i2c = make_display()
+    import lcd_glyphs
+
+    glyphs = lcd_glyphs.GlyphManager(display, GLYPHS)
+    for rows in frames():
+        lines = ["".join(glyphs.char(name) for name in names) for names in rows]
+        glyphs.flush()
+        display.render(lines)
+        check(hw, rows)
+    return hw, i2c
+
+
+def main():
+    print("{:<22} {:>12} {:>14} {:>12} {:>10}".format(
+        "method", "transactions", "bytes/frame", "ms/frame", "data writes"))
+    for method in (create_char_per_frame, glyph_manager):
+        hw, i2c = method()
+        controller = hw.lcd.controller
+        print("{:<22} {:>12} {:>14.1f} {:>12.2f} {:>10}".format(
+            method.__name__, i2c.transactions, i2c.bytes_written / FRAMES,
+            hw.clock.now_ns / 1e6 / FRAMES, controller.data_writes))
+
+
+if __name__ == "__main__":
+    main()
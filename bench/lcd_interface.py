@@ -0,0 +1,90 @@
+"""Throughput of the PCF8574 LCD interface on the simulator.
+
+Run from the repository root::
+
+    python bench/lcd_interface.py
+
+Sends a 16-character line three ways against the emulated expander: the
+original path (three one-byte transactions per nibble plus a 100 us wait),
+one batched transaction per character with ``send``, and one transaction
+per string with ``send_bytes``.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+TEXT = b"Encoder: 123    "
+_RS_DATA = 0x01
+
+
+def make_interface(frequency):
+    hw = sim.install()
+    hw.import_firmware("i2c_pcf8574_interface")
+    import board
+    import busio
+    import microcontroller
+    import i2c_pcf8574_interface
+    import lcd
+    from lcd import PIN_ENABLE
+
+    class UnbatchedInterface(i2c_pcf8574_interface.I2CPCF8574Interface):
+        """The interface as it was before batching."""
+
+        def send(self, value, rs_mode):
+            self._write4bits(rs_mode | (value & 0xF0) | self._backlight_pin_state)
+            self._write4bits(rs_mode | ((value << 4) & 0xF0) | self._backlight_pin_state)
+
+        def _write4bits(self, value):
+            with self.i2c_device:
+                self._i2c_write(value & ~PIN_ENABLE)
+                microcontroller.delay_us(1)
+                self._i2c_write(value | PIN_ENABLE)
+                microcontroller.delay_us(1)
+                self._i2c_write(value & ~PIN_ENABLE)
+            microcontroller.delay_us(100)
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0, frequency=frequency)
+    interfaces = {
+        "unbatched": UnbatchedInterface(i2c, 0x27),
+        "batched": i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27),
+    }
+    # Initialize the controller, leaving the cursor at the top left
+    lcd.LCD(interfaces["batched"], num_rows=2, num_cols=16)
+    return hw, i2c, interfaces
+
+
+def per_char(interface):
+    for value in TEXT:
+        interface.send(value, _RS_DATA)
+
+
+def per_string(interface):
+    interface.send_bytes(TEXT, _RS_DATA)
+
+
+def main():
+    print("{:>7} {:<20} {:>10} {:>10} {:>10} {:>12}".format(
+        "kHz", "path", "trans/chr", "bytes/chr", "chars/s", "bus bytes/s"))
+    for frequency in (100000, 400000):
+        for name, interface_name, send in (
+                ("unbatched send", "unbatched", per_char),
+                ("batched send", "batched", per_char),
+                ("send_bytes", "batched", per_string)):
+            hw, i2c, interfaces = make_interface(frequency)
+            transactions, written, start_ns = i2c.transactions, i2c.bytes_written, hw.clock.now_ns
+            send(interfaces[interface_name])
+            seconds = (hw.clock.now_ns - start_ns) / 1e9
+            written = i2c.bytes_written - written
+            assert bytes(hw.lcd.controller.ddram[:len(TEXT)]) == TEXT
+            assert hw.lcd.controller.busy_violations == 0
+            print("{:>7} {:<20} {:>10.2f} {:>10.2f} {:>10.0f} {:>12.0f}".format(
+                frequency // 1000, name, (i2c.transactions - transactions) / len(TEXT),
+                written / len(TEXT), len(TEXT) / seconds, written / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-frame CPU cost of str vs. pre-encoded labels, and A00 encoding.
+
+Run from the repository root::
+
+    python bench/lcd_labels.py
+
+Renders the status screen many times on the simulator, with the mode line
+built and encoded as a ``str`` every frame and as ``bytes`` encoded once at
+load time. The numbers are host CPU time, so only the ratio means anything.
+Then a line of A00 characters (arrows, degree sign, Greek letters and a
+custom character) is checked against the codes on the emulated display.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+FRAMES = 5000
+A00_LINE = "→20°C α←β πΩ\x00"
+A00_CODES = bytes((0x7E, 0x32, 0x30, 0xDF, 0x43, 0x20, 0xE0, 0x7F, 0xE2, 0x20, 0xF7, 0xF4, 0x00))
+
+
+def make_display():
+    hw = sim.install()
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+    import lcd_charset
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27)
+    charset = lcd_charset.Charset()
+    return hw, lcd.LCD(interface, num_rows=2, num_cols=16, charset=charset), charset
+
+
+def str_labels(display, charset, name):
+    for frame in range(FRAMES):
+        display.render(("Mode: " + name, "Encoder: 12"))
+
+
+def encoded_labels(display, charset, name):
+    label = charset.encode("Mode: " + name)
+    for frame in range(FRAMES):
+        display.render((label, "Encoder: 12"))
+
+
+def main():
+    print("{:<16} {:>12}".format("labels", "us/frame"))
+    for method in (str_labels, encoded_labels):
+        hw, display, charset = make_display()
+        start = time.perf_counter()
+        method(display, charset, "BLENDER")
+        elapsed = time.perf_counter() - start
+        assert hw.lcd.lines()[0] == "Mode: BLENDER   "
+        print("{:<16} {:>12.1f}".format(method.__name__, elapsed / FRAMES * 1e6))
+
+    hw, display, charset = make_display()
+    display.render((A00_LINE, ""))
+    ddram = bytes(hw.lcd.controller.ddram[:len(A00_CODES)])
+    assert ddram == A00_CODES, ddram
+    print("A00 line encoded as {}".format(ddram.hex(" ")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""I2C traffic for scrolling text wider than the LCD, on the simulator.
+
+Run from the repository root::
+
+    python bench/lcd_marquee.py
+
+Scrolls a mode line longer than 16 columns one cell per step, either by
+rendering the visible 16-cell window every step or with ``marquee()`` and
+one ``shift_display`` per step. Every step is checked against the emulated
+screen. Then main.py is run with a long mode name to check that its marquee
+task sends nothing but the shift commands.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+LINES = ("Mode: BLENDER SCULPT + PAINT", "Encoder: 12")
+STEPS = 80
+LINE_LENGTH = 40
+
+
+def expected(step):
+    """The screen after ``step`` steps: a 16-cell window into each
+    40-cell line, starting ``step`` cells in."""
+    return ["".join(line.ljust(LINE_LENGTH)[(step + col) % LINE_LENGTH] for col in range(16))
+            for line in LINES]
+
+
+def make_display():
+    hw = sim.install()
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27)
+    return hw, lcd.LCD(interface, num_rows=2, num_cols=16), i2c
+
+
+def render_window(display, step):
+    display.render(expected(step))
+
+
+def marquee(display, step):
+    if step == 0:
+        display.marquee(LINES)
+    else:
+        display.shift_display(-1)
+
+
+def measure(draw):
+    hw, display, i2c = make_display()
+    draw(display, 0)
+    assert hw.lcd.lines() == expected(0), hw.lcd.lines()
+    written, start_ns = i2c.bytes_written, hw.clock.now_ns
+    for step in range(1, STEPS + 1):
+        draw(display, step)
+        assert hw.lcd.lines() == expected(step), (step, hw.lcd.lines())
+    return (i2c.bytes_written - written) / STEPS, (hw.clock.now_ns - start_ns) / 1e6 / STEPS
+
+
+def firmware_bytes_per_step():
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main = hw.import_firmware("main")
+        main.MODE_LABELS = (main.display.encode(LINES[0]),) + main.MODE_LABELS[1:]
+        hw.run(main.scheduler, 500)
+        assert main.display.scrolling
+        bus = hw.i2c_buses[0]
+        written = bus.bytes_written
+        hw.run(main.scheduler, main.MARQUEE_STEP_MS * 10)
+    return (bus.bytes_written - written) / 10
+
+
+def main():
+    print("{:<14} {:>10} {:>9}".format("method", "bytes/step", "ms/step"))
+    for draw in (render_window, marquee):
+        print("{:<14} {:>10.1f} {:>9.2f}".format(draw.__name__, *measure(draw)))
+    print("main.py marquee task: {:.1f} bytes per step".format(firmware_bytes_per_step()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Check and measure ``LCD.print`` against the emulated HD44780.
+
+Run from the repository root::
+
+    python bench/lcd_print.py
+
+Prints random text with newlines and row wraps through ``lcd.LCD``. After
+each print the emulated controller's DDRAM is compared byte for byte with
+a reference model of the documented wrapping rules. It then reports I2C
+bytes per character, compared with the old write path that re-sent the
+cursor address after every character.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+ROWS = 2
+COLS = 16
+_ROW_ADDRESSES = (0x00, 0x40)
+
+
+def make_display(legacy=False):
+    hw = sim.install()
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+
+    class LegacyLCD(lcd.LCD):
+        """Writes the way LCD.write did before streaming: one character,
+        then an explicit cursor move."""
+
+        def print(self, string):
+            for char in string:
+                if char == "\n":
+                    self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
+                else:
+                    self.write(ord(char))
+
+        def write(self, value):
+            self.interface.send(value, 0x01)
+            self._shadow[self._row][self._col] = value
+            if self._col < self.num_cols - 1:
+                self._col += 1
+            else:
+                self._row = (self._row + 1) % self.num_rows
+                self._col = 0
+            self.set_cursor_pos(self._row, self._col)
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27)
+    display = (LegacyLCD if legacy else lcd.LCD)(interface, num_rows=ROWS, num_cols=COLS)
+    return hw, i2c, display
+
+
+class Reference:
+    """Where each printed character should land."""
+
+    def __init__(self):
+        self.ddram = bytearray(b" " * 0x80)
+        self.row = self.col = 0
+
+    def print(self, string):
+        for char in string:
+            if char == "\n":
+                self.row, self.col = (self.row + 1) % ROWS, 0
+                continue
+            if self.col == COLS:
+                self.row, self.col = (self.row + 1) % ROWS, 0
+            self.ddram[_ROW_ADDRESSES[self.row] + self.col] = ord(char)
+            self.col += 1
+
+    def move(self, row, col):
+        self.row, self.col = row, col
+
+
+def random_text(rng):
+    return "".join(rng.choice("abcXYZ0123 :\n" if rng.random() < 0.3 else "abcXYZ0123 :")
+                   for _ in range(rng.randint(1, 40)))
+
+
+def verify(seed=1, prints=2000):
+    rng = random.Random(seed)
+    hw, i2c, display = make_display()
+    reference = Reference()
+    for _ in range(prints):
+        if rng.random() < 0.2:
+            row, col = rng.randrange(ROWS), rng.randrange(COLS)
+            display.set_cursor_pos(row, col)
+            reference.move(row, col)
+        text = random_text(rng)
+        display.print(text)
+        reference.print(text)
+        assert hw.lcd.controller.ddram == reference.ddram, text
+    assert hw.lcd.controller.busy_violations == 0
+    return prints
+
+
+def cost(text, legacy):
+    hw, i2c, display = make_display(legacy)
+    written, start_ns = i2c.bytes_written, hw.clock.now_ns
+    display.print(text)
+    return (i2c.bytes_written - written) / len(text), (hw.clock.now_ns - start_ns) / 1e6
+
+
+def main():
+    print("Verified {} prints byte for byte against the emulated DDRAM".format(verify()))
+    print("{:<28} {:>14} {:>8} {:>14} {:>8}".format("text", "old bytes/chr", "old ms", "new bytes/chr", "new ms"))
+    for text in ("Encoder: 123", "Mode: BLENDER", "A line longer than sixteen columns"):
+        print("{:<28} {:>14.2f} {:>8.2f} {:>14.2f} {:>8.2f}".format(
+            text[:28], *(cost(text, True) + cost(text, False))))
+
+
+if __name__ == "__main__":
+    main()
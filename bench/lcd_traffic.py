@@ -0,0 +1,68 @@
+"""I2C traffic per LCD frame on the simulator.
+
+Run from the repository root::
+
+    python bench/lcd_traffic.py
+
+Compares redrawing the status screen with ``clear()`` + ``print()`` against
+``render()``, for an idle frame and for a frame where one digit changes.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+FRAMES = (
+    ("idle", ("Mode: BLENDER", "Encoder: 12"), ("Mode: BLENDER", "Encoder: 12")),
+    ("one digit", ("Mode: BLENDER", "Encoder: 12"), ("Mode: BLENDER", "Encoder: 13")),
+    ("mode switch", ("Mode: BLENDER", "Encoder: 12"), ("Mode: KRITA", "Encoder: 12")),
+)
+
+
+def make_display():
+    hw = sim.install()
+    hw.import_firmware("lcd")
+    import board
+    import busio
+    import i2c_pcf8574_interface
+    import lcd
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    interface = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, 0x27)
+    return hw, lcd.LCD(interface, num_rows=2, num_cols=16), i2c
+
+
+def redraw(display, lines):
+    display.clear()
+    display.print(lines[0])
+    display.set_cursor_pos(1, 0)
+    display.print(lines[1])
+
+
+def render(display, lines):
+    display.render(lines)
+
+
+def measure(draw, before, after):
+    hw, display, i2c = make_display()
+    draw(display, before)
+    transactions, written, start_ns = i2c.transactions, i2c.bytes_written, hw.clock.now_ns
+    draw(display, after)
+    assert hw.lcd.lines() == [(line + " " * 16)[:16] for line in after]
+    return (i2c.transactions - transactions, i2c.bytes_written - written,
+            (hw.clock.now_ns - start_ns) / 1e6)
+
+
+def main():
+    print("{:<12} {:<8} {:>12} {:>8} {:>8}".format("frame", "method", "transactions", "bytes", "ms"))
+    for name, before, after in FRAMES:
+        for draw in (redraw, render):
+            print("{:<12} {:<8} {:>12} {:>8} {:>8.2f}".format(
+                name, draw.__name__, *measure(draw, before, after)))
+
+
+if __name__ == "__main__":
+    main()
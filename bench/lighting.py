@@ -0,0 +1,128 @@
+"""Cost of the per-key lighting, on the simulator.
+
+Run from the repository root::
+
+    python bench/lighting.py
+
+Boots main.py and types a random key every 50 ms while the volume encoder
+turns now and then, then leaves the keys alone for the last two seconds.
+The simulated NeoPixel chain blocks for its wire time on every ``show()``, as the RP2040
+driver does. Reports how many lighting task runs showed a frame, how many
+pixels were written per frame, and the share of time spent in ``show()``.
+
+The key press latency (scan to HID report, as in bench/latency.py) is
+measured with the key matrix scans moved part way into the firmware's
+millisecond ticks, over a sweep of phases across the 20 ms scan interval,
+so that some scans land while ``show()`` is blocking. Then the same runs
+are repeated with the lighting task doing nothing. A press that comes in
+during ``show()`` waits for it to finish, so lighting may add up to one
+``show()`` to the worst latency, but no more, and must not move the p99.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+from latency import percentile, time_key_presses  # noqa: E402
+
+DURATION_MS = 5000
+TAP_INTERVAL_MS = 50
+HOLD_MS = 25
+TURN_INTERVAL_MS = 700
+IDLE_MS = 2000
+# Delays of the key matrix scans: off the millisecond ticks, and across the
+# whole scan interval, so the scans meet the lighting task at every phase
+SCAN_PHASES_US = range(250, 20000, 500)
+
+
+def run(lighting_enabled, phase_us=0, seed=1):
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main = hw.import_firmware("main")
+    hw.scanners[0].delay_scans(phase_us * 1000)
+    rng = random.Random(seed)
+    start_ms = hw.clock.now_ms + 1
+    for at_ms in range(start_ms, start_ms + DURATION_MS - IDLE_MS, TAP_INTERVAL_MS):
+        hw.tap(rng.randrange(24), at_ms=at_ms, hold_ms=HOLD_MS)
+    turns = list(range(start_ms, start_ms + DURATION_MS - IDLE_MS, TURN_INTERVAL_MS))
+
+    pixels = hw.neopixels[0]
+    del pixels.frames[:]
+    hw.keyboard.reports.clear()
+    written = [0]
+    set_pixel = type(pixels).__setitem__
+
+    def counting_setitem(self, index, color):
+        written[0] += 1
+        set_pixel(self, index, color)
+
+    type(pixels).__setitem__ = counting_setitem
+    runs = [0]
+    update = main.lighting.update
+
+    def counted_update():
+        runs[0] += 1
+        if lighting_enabled:
+            update()
+
+    for task in main.scheduler.tasks:
+        if task.name == "lighting":
+            task.callback = counted_update
+
+    latencies = time_key_presses(hw, main)
+
+    end_ms = start_ms + DURATION_MS
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            while hw.clock.now_ms < end_ms:
+                now_ms = hw.clock.now_ms
+                if turns and turns[0] <= now_ms:
+                    turns.pop(0)
+                    hw.turn(main.board.GP17, rng.choice((-3, 3)))
+                main.scheduler.run_due(now_ms)
+                # A pass that overran its millisecond goes straight on
+                hw.clock.set_ms(max(hw.clock.now_ms, now_ms + 1))
+    finally:
+        type(pixels).__setitem__ = set_pixel
+
+    shows = len(pixels.frames)
+    return {
+        "runs": runs[0],
+        "shows": shows,
+        "pixels": written[0] / shows if shows else 0,
+        "busy": shows * pixels.n * pixels.bpp * 8 * pixels.BIT_NS / (DURATION_MS * 1e6),
+        "show_ms": pixels.n * pixels.bpp * 8 * pixels.BIT_NS / 1e6,
+        "latencies": latencies,
+    }
+
+
+def main():
+    print("{:<9} {:>6} {:>6} {:>13} {:>7} {:>8} {:>8} {:>8}".format(
+        "lighting", "runs", "shows", "pixels/show", "busy", "presses", "p99 ms", "max ms"))
+    results = {}
+    for enabled in (True, False):
+        result = run(enabled)
+        latencies = []
+        for phase_us in SCAN_PHASES_US:
+            latencies.extend(run(enabled, phase_us)["latencies"])
+        result = results[enabled] = dict(
+            result, presses=len(latencies), p99_ms=percentile(latencies, 0.99),
+            max_ms=max(latencies))
+        print("{:<9} {runs:>6} {shows:>6} {pixels:>13.1f} {busy:>7.1%} {presses:>8} "
+              "{p99_ms:>8.3f} {max_ms:>8.3f}".format("on" if enabled else "off", **result))
+    show_ms = results[True]["show_ms"]
+    print("One show(): {:.3f} ms; lighting adds {:.3f} ms to the worst latency".format(
+        show_ms, results[True]["max_ms"] - results[False]["max_ms"]))
+    assert results[True]["presses"] == results[False]["presses"]
+    assert results[True]["p99_ms"] <= results[False]["p99_ms"], "lighting delays key presses"
+    assert results[True]["max_ms"] <= results[False]["max_ms"] + show_ms, \
+        "lighting delays key presses by more than one show()"
+
+
+if __name__ == "__main__":
+    main()
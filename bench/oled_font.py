@@ -0,0 +1,100 @@
+"""Glyph preloading for the OLED: RAM use and first-frame time.
+
+Run from the repository root::
+
+    python bench/oled_font.py
+
+Builds `font_cache.GlyphCache` from main.py's DISPLAY_TEXT and from all of
+printable ASCII, over a font that counts the glyphs it is asked to load
+the way ``adafruit_bitmap_font`` loads them from a file. It checks that no
+glyph outside the labels is loaded and reports the packed size and the
+Python heap the cache holds (tracemalloc). It then times the first frame
+with the glyphs preloaded at boot against loading them during that frame.
+Times are host CPU time, so only the ratio means anything.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+FRAME = ("Mode: BLENDER", "Encoder: 12")
+REPEATS = 200
+
+
+def make_font_class(font_cache):
+    class CountingFont(font_cache.BuiltinFont):
+        """Records every glyph requested from the font."""
+
+        def __init__(self):
+            self.loaded = set()
+
+        def load_glyphs(self, code_points):
+            self.loaded.update(code_points)
+
+        def get_glyph(self, code_point):
+            self.loaded.add(chr(code_point))
+            return super().get_glyph(code_point)
+
+    return CountingFont
+
+
+def heap_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    hw = sim.install(oled_address=0x3C)
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware = hw.import_firmware("main")
+    import board
+    import busio
+    import displays
+    import font_cache
+
+    CountingFont = make_font_class(font_cache)
+    ascii_text = "".join(chr(code) for code in range(0x20, 0x7F))
+
+    print("{:<14} {:>7} {:>13} {:>11}".format("cache", "glyphs", "packed bytes", "heap bytes"))
+    for name, text in (("labels", firmware.DISPLAY_TEXT), ("ASCII", ascii_text)):
+        font = CountingFont()
+        cache, heap = heap_bytes(lambda: font_cache.GlyphCache(font, text))
+        assert font.loaded <= set(text + "?"), font.loaded - set(text + "?")
+        print("{:<14} {:>7} {:>13} {:>11}".format(name, len(cache), cache.size, heap))
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    frame_text = "".join(FRAME)
+
+    def first_frame(preloaded):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            font = preloaded or font_cache.GlyphCache(CountingFont(), frame_text)
+            display = displays.SSD1306Display(i2c, font=font)
+            display.render(FRAME)
+        return (time.perf_counter() - start) / REPEATS * 1e6
+
+    def boot_only():
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            displays.SSD1306Display(i2c, font=preloaded)
+        return (time.perf_counter() - start) / REPEATS * 1e6
+
+    preloaded = font_cache.GlyphCache(CountingFont(), firmware.DISPLAY_TEXT)
+    setup_us = boot_only()
+    print("First frame, glyphs loaded during it: {:7.1f} us".format(first_frame(None) - setup_us))
+    print("First frame, glyphs preloaded:        {:7.1f} us".format(first_frame(preloaded) - setup_us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""I2C traffic per frame for the SSD1306 OLED backend, on the simulator.
+
+Run from the repository root::
+
+    python bench/oled_traffic.py
+
+Draws the status frames of bench/lcd_traffic.py on an emulated 128x64
+SSD1306 through `displays.SSD1306Display` and reports the bytes sent per
+frame next to a full 1 KB framebuffer write. The frames are sent unbudgeted
+and in 500 us pump slices, and each time the emulated display RAM must
+match the framebuffer. The same frames go to the HD44780 backend as well.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+FRAMES = (
+    ("boot", ("NAT 20",)),
+    ("first frame", ("Mode: BLENDER", "Encoder: 12")),
+    ("idle", ("Mode: BLENDER", "Encoder: 12")),
+    ("one digit", ("Mode: BLENDER", "Encoder: 13")),
+    ("mode switch", ("Mode: KRITA", "Encoder: 13")),
+)
+
+# Control byte and data for every page, plus the addressing commands
+FULL_FRAME_BYTES = 8 * 129 + 7
+
+
+def run(backend, budget_us):
+    hw = sim.install(oled_address=0x3C)
+    hw.import_firmware("displays")
+    import board
+    import busio
+    import displays
+
+    i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
+    if backend == "ssd1306":
+        display = displays.SSD1306Display(i2c)
+    else:
+        display = displays.HD44780Display(i2c)
+    results = []
+    for name, lines in FRAMES:
+        written = i2c.bytes_written
+        display.render(lines)
+        pumps = 1
+        while not display.pump(budget_us):
+            pumps += 1
+            # The controller needs a moment between LCD transactions
+            hw.clock.advance_us(100)
+        if backend == "ssd1306":
+            assert hw.oled.gddram == display.framebuffer, name
+        else:
+            assert hw.lcd.lines() == [(line + " " * 16)[:16] for line in (lines + ("",))[:2]], name
+        results.append((name, i2c.bytes_written - written, pumps))
+    return hw, results
+
+
+def main():
+    print("Full SSD1306 framebuffer write: {} bytes".format(FULL_FRAME_BYTES))
+    print("{:<8} {:<10} {:<12} {:>8} {:>6}".format("backend", "budget", "frame", "bytes", "pumps"))
+    for backend in ("ssd1306", "hd44780"):
+        for budget_us in (None, 500):
+            hw, results = run(backend, budget_us)
+            for name, written, pumps in results:
+                print("{:<8} {:<10} {:<12} {:>8} {:>6}".format(
+                    backend, "none" if budget_us is None else "{} us".format(budget_us),
+                    name, written, pumps))
+    hw, _ = run("ssd1306", None)
+    for row in hw.oled.dump()[:16]:
+        print(row[:84])
+
+
+if __name__ == "__main__":
+    main()
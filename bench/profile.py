@@ -0,0 +1,54 @@
+"""Per-task time histograms of main.py on the simulator.
+
+Run from the repository root::
+
+    python bench/profile.py
+
+Boots main.py, wraps every scheduler task with `profiler.Profiler` and runs
+one second of typing while the volume encoder turns and the mode changes.
+Virtual time only moves for bus and wire time (I2C, NeoPixels, sleeps), so
+the histograms show which tasks block on hardware; Python overhead shows
+up only on the board, with PROFILING set in main.py.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+DURATION_MS = 1000
+
+
+def main():
+    hw = sim.install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        firmware = hw.import_firmware("main")
+    # main.py only imports it with PROFILING on
+    profiler = hw.import_firmware("profiler", purge=False)
+
+    stages = profiler.Profiler()
+    for task in firmware.scheduler.tasks:
+        task.callback = stages.wrap(task.callback, task.name)
+
+    start_ms = hw.clock.now_ms + 1
+    for at_ms in range(start_ms, start_ms + DURATION_MS, 40):
+        hw.tap((at_ms // 40) % 24, at_ms=at_ms, hold_ms=20)
+    end_ms = start_ms + DURATION_MS
+    with contextlib.redirect_stdout(io.StringIO()):
+        while hw.clock.now_ms < end_ms:
+            now_ms = hw.clock.now_ms
+            if now_ms % 150 == 0:
+                hw.turn(firmware.board.GP17, 2)
+            if now_ms % 400 == 0:
+                hw.turn(firmware.board.GP22, 1)
+            firmware.scheduler.run_due(now_ms)
+            hw.clock.set_ms(max(hw.clock.now_ms, now_ms + 1))
+    stages.dump()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Cost of the scheduler's timer wheel as timers pile up.
+
+Run from the repository root::
+
+    python bench/timer_wheel.py
+
+Registers main.py's eleven task cadences, then adds idle one-shot timers
+that are seconds away, as debounce and animation timers would be, and
+times one scheduler tick (`Scheduler.run_due` for the next millisecond)
+and a start/cancel pair. A tick only walks the slot of the current
+millisecond, so its cost grows with pending timers divided by the 64
+slots, and start/cancel does not grow at all. Times are host CPU time, so
+only the ratios mean anything.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sim  # noqa: E402
+
+TASK_INTERVALS_MS = (1, 10, 20, 100, 1, 300, 20, 1000, 50, 100, 200)
+PENDING = (0, 16, 64, 256, 1024)
+TICKS = 20000
+
+
+def main():
+    hw = sim.install()
+    hw.import_firmware("scheduler")
+    import scheduler
+
+    print("{:>8} {:>10} {:>16}".format("pending", "us/tick", "us/start+cancel"))
+    results = []
+    for pending in PENDING:
+        hw.clock.set_ms(0)
+        wheel = scheduler.Scheduler()
+        for interval_ms in TASK_INTERVALS_MS:
+            wheel.every(interval_ms, lambda: None, name="task")
+        for i in range(pending):
+            wheel.start(wheel.timer(lambda: None, name="idle"), 60000 + i)
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            hw.clock.advance_ms(1)
+            wheel.run_due(hw.clock.now_ms)
+        tick_us = (time.perf_counter() - start) / TICKS * 1e6
+
+        timer = wheel.timer(lambda: None, name="debounce")
+        start = time.perf_counter()
+        for i in range(TICKS):
+            wheel.start(timer, 100 + i % 64)
+            wheel.cancel(timer)
+        start_us = (time.perf_counter() - start) / TICKS * 1e6
+        results.append((tick_us, start_us))
+        print("{:>8} {:>10.2f} {:>16.2f}".format(pending, tick_us, start_us))
+    # Scanning every pending timer each tick would cost hundreds of times more
+    assert results[-1][0] < 4 * results[0][0], "tick cost grows with pending timers"
+    assert results[-1][1] < 2 * results[0][1], "start/cancel cost grows with pending timers"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Key bindings for each mode.
+
+Each mode is a ``(name, bindings)`` pair. ``bindings`` is indexed by key
+number (0-23) and holds ``(label, keycodes)`` pairs. Add a mode by adding
+an entry to ``MODES``.
+"""
+
+from adafruit_hid.keycode import Keycode
+
+NUM_KEYS = 24
+
+BLENDER = (
+    ("tab", (Keycode.TAB,)),
+    ("B", (Keycode.B,)),
+    ("G", (Keycode.G,)),
+    ("R", (Keycode.R,)),
+    ("S", (Keycode.S,)),
+    ("O", (Keycode.O,)),
+    ("E", (Keycode.E,)),
+    ("I", (Keycode.I,)),
+    ("X", (Keycode.X,)),
+    ("Y", (Keycode.Y,)),
+    ("Z", (Keycode.Z,)),
+    ("undo", (Keycode.CONTROL, Keycode.Z)),
+    ("NUM 0", (Keycode.KEYPAD_ZERO,)),
+    ("NUM .", (Keycode.KEYPAD_PERIOD,)),
+    ("1", (Keycode.ONE,)),
+    ("2", (Keycode.TWO,)),
+    ("3", (Keycode.THREE,)),
+    ("CTRL + ALT + Z", (Keycode.CONTROL, Keycode.ALT, Keycode.Z)),
+    ("shift", (Keycode.SHIFT,)),
+    ("SHIFT + ALT", (Keycode.SHIFT, Keycode.ALT)),
+    ("A", (Keycode.A,)),
+    ("SHIFT + A", (Keycode.SHIFT, Keycode.A)),
+    ("loop cut", (Keycode.CONTROL, Keycode.R)),
+    ("save", (Keycode.CONTROL, Keycode.S)),
+)
+
+KRITA = (
+    ("tab", (Keycode.TAB,)),
+    ("B", (Keycode.B,)),
+    ("CTRL + T", (Keycode.CONTROL, Keycode.T)),
+    ("CTRL + A", (Keycode.CONTROL, Keycode.A)),
+    ("CTRL + J", (Keycode.CONTROL, Keycode.J)),
+    ("new layer", (Keycode.CONTROL, Keycode.SHIFT, Keycode.N)),
+    ("ctrl", (Keycode.CONTROL,)),
+    ("N", (Keycode.N,)),
+    ("M", (Keycode.M,)),
+    ("K", (Keycode.K,)),
+    ("CTRL + D", (Keycode.CONTROL, Keycode.D)),
+    ("undo", (Keycode.CONTROL, Keycode.Z)),
+    ("F", (Keycode.F,)),
+    ("E", (Keycode.E,)),
+    ("B", (Keycode.B,)),
+    ("[", (Keycode.LEFT_BRACKET,)),
+    ("]", (Keycode.RIGHT_BRACKET,)),
+    ("redo", (Keycode.CONTROL, Keycode.SHIFT, Keycode.Z)),
+    ("space", (Keycode.SPACE,)),
+    ("CTRL + SPACE", (Keycode.CONTROL, Keycode.SPACE)),
+    ("SHIFT + SPACE", (Keycode.SHIFT, Keycode.SPACE)),
+    (",", (Keycode.COMMA,)),
+    (". + R", (Keycode.PERIOD, Keycode.R)),
+    ("save", (Keycode.CONTROL, Keycode.S)),
+)
+
+MODES = (
+    ("BLENDER", BLENDER),
+    ("KRITA", KRITA),
+)
@@ -0,0 +1,63 @@
+"""Non-blocking output queue for stepped ConsumerControl codes such as volume."""
+
+from scheduler import ticks_ms, ticks_add, ticks_diff
+
+
+class ConsumerStepQueue:
+
+    def __init__(self, consumer_control, increment_code, decrement_code,
+                 interval_ms=20, max_pending=None, clock=ticks_ms):
+        """
+        Queues signed steps and sends them as ConsumerControl reports at a
+        rate the host can keep up with.
+
+        :param consumer_control: The ``ConsumerControl`` to send through.
+        :param increment_code: Code sent for each positive step.
+        :param decrement_code: Code sent for each negative step.
+        :param interval_ms: Minimum time between two steps. Default: 20.
+        :param max_pending: Most steps kept queued in either direction;
+            more are dropped. Default: no limit.
+        :param clock: Function returning the current time in ``ticks_ms``.
+        """
+        self.consumer_control = consumer_control
+        self.increment_code = increment_code
+        self.decrement_code = decrement_code
+        self.interval_ms = interval_ms
+        self.max_pending = max_pending
+        self.clock = clock
+        self.pending = 0
+        self._next_send_ms = clock()
+
+    def add(self, steps):
+        """Queue ``steps`` steps; negative values step down. Steps in opposite
+        directions cancel out before anything is sent. Returns the change to
+        what will be sent, which is less than ``steps`` if some went over
+        ``max_pending`` and were dropped."""
+        pending = self.pending + steps
+        if self.max_pending is not None:
+            pending = min(self.max_pending, max(-self.max_pending, pending))
+        accepted = pending - self.pending
+        self.pending = pending
+        return accepted
+
+    def clear(self):
+        """Drop all queued steps."""
+        self.pending = 0
+
+    def service(self, now_ms=None):
+        """Send at most one queued step if the interval has elapsed. Never blocks.
+        Returns True if a step was sent."""
+        if not self.pending:
+            return False
+        if now_ms is None:
+            now_ms = self.clock()
+        if ticks_diff(now_ms, self._next_send_ms) < 0:
+            return False
+        if self.pending > 0:
+            self.consumer_control.send(self.increment_code)
+            self.pending -= 1
+        else:
+            self.consumer_control.send(self.decrement_code)
+            self.pending += 1
+        self._next_send_ms = ticks_add(now_ms, self.interval_ms)
+        return True
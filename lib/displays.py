@@ -0,0 +1,281 @@
+"""Display backends that draw the same frames on different hardware.
+
+A frame is a sequence of lines, one per row, each a ``str`` or pre-encoded
+``bytes`` from the backend's `encode`. Every backend provides:
+
+* ``num_rows`` and ``num_cols``: the text grid.
+* ``encode(text)``: a label encoded once, to pass in frames.
+* ``render(lines)``: draw a frame. Only what changed is queued.
+* ``idle``: True when everything queued has been sent.
+* ``pump(budget_us)``: send queued traffic within a time budget. Never
+  sleeps. Returns True once everything is sent.
+* ``scroll()``: advance lines too wide for the display by one step.
+"""
+
+from micropython import const
+from adafruit_bus_device.i2c_device import I2CDevice
+
+import lcd
+from font_cache import BuiltinFont, GlyphCache
+from i2c_pcf8574_interface import I2CPCF8574Interface
+from lcd_charset import Charset
+from lcd_queue import QueuedInterface
+
+# SSD1306 control bytes that start a transaction
+_OLED_COMMANDS = const(0x00)
+_OLED_DATA = const(0x40)
+
+# Bus clocks per byte, and for a transaction's start, address byte and stop
+_BITS_PER_BYTE = const(9)
+_TRANSACTION_BITS = const(20)
+
+_NOT_DIRTY = const(0xFF)
+
+
+class HD44780Display:
+
+    def __init__(self, i2c, address=0x27, num_rows=2, num_cols=16, warm_start=True,
+                 charset=None):
+        """
+        HD44780 character LCD on a PCF8574 backpack, drawn through a
+        `QueuedInterface`.
+
+        Lines wider than the display are shown as a marquee that `scroll`
+        moves with one display shift per step.
+
+        :param i2c: The ``busio.I2C`` bus.
+        :param address: I2C address of the backpack. Default: 0x27.
+        :param warm_start: See `lcd.LCD`. Default: True.
+        :param charset: `Charset` for str text. Default: the A00 ROM.
+        """
+        self.charset = charset or Charset()
+        self.queue = QueuedInterface(I2CPCF8574Interface(i2c, address))
+        self.lcd = lcd.LCD(self.queue, num_rows=num_rows, num_cols=num_cols,
+                           warm_start=warm_start, charset=self.charset)
+        self.lcd.set_backlight(True)
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.scrolling = False
+
+    @property
+    def idle(self):
+        return self.queue.idle
+
+    def encode(self, text):
+        return self.charset.encode(text)
+
+    def render(self, lines):
+        # Lines too wide for the display scroll as a marquee instead of wrapping
+        self.scrolling = False
+        for line in lines:
+            if len(line) > self.num_cols:
+                self.scrolling = True
+        if self.scrolling:
+            self.lcd.marquee(lines)
+        else:
+            self.lcd.render(lines)
+
+    def pump(self, budget_us=None):
+        return self.queue.pump(budget_us)
+
+    def scroll(self):
+        # One shift command per step; the text is already in DDRAM
+        if self.scrolling and self.queue.idle:
+            self.lcd.shift_display(-1)
+
+
+class SSD1306Display:
+
+    def __init__(self, i2c, address=0x3C, width=128, height=64, frequency=100000, font=None):
+        """
+        SSD1306 OLED showing text on the same I2C bus as the LCD, in a grid
+        of the font's cells.
+
+        A frame is drawn into a framebuffer in RAM, and each page remembers
+        the range of columns that changed. `pump` sends only those ranges,
+        so a changed digit costs a few dozen bytes instead of the whole
+        framebuffer.
+
+        :param i2c: The ``busio.I2C`` bus.
+        :param address: I2C address of the display. Default: 0x3C.
+        :param width: Width in pixels. Default: 128.
+        :param height: Height in pixels, 32 or 64. Default: 64.
+        :param frequency: I2C bus frequency in Hz, used to fit transfers in
+            a pump budget. Default: 100000.
+        :param font: `GlyphCache` with the glyphs to draw. Default: the
+            built-in 5x7 font with all of printable ASCII.
+        """
+        self.i2c_device = I2CDevice(i2c, address)
+        self.width = width
+        self.pages = height // 8
+        if font is None:
+            font = GlyphCache(BuiltinFont(), ''.join(chr(code) for code in range(0x20, 0x7F)))
+        self.font = font
+        self.num_rows = self.pages // font.pages
+        self.num_cols = width // font.cell_width
+        self.scrolling = False
+        self._byte_ns = _BITS_PER_BYTE * 1000000000 // frequency
+        self._transaction_ns = _TRANSACTION_BITS * 1000000000 // frequency
+
+        self.framebuffer = bytearray(width * self.pages)
+        # Character code shown in each cell, to skip unchanged ones
+        self._cells = [bytearray(b' ' * self.num_cols) for _ in range(self.num_rows)]
+        # Dirty column range [start, end) of each page
+        self._dirty_start = bytearray(b'\xff' * self.pages)
+        self._dirty_end = bytearray(self.pages)
+        # Where the controller's RAM pointer is, if known: writes continue
+        # there without another addressing command
+        self._pointer_page = -1
+        self._pointer_column = 0
+        # Control byte plus up to one page of data
+        self._buffer = bytearray(1 + width)
+        self._command_buffer = bytearray(7)
+        self._command_buffer[0] = _OLED_COMMANDS
+
+        self._init_controller(height)
+        # The RAM content is unknown: send the blank framebuffer once
+        self._mark(0, self.pages, 0, width)
+
+    def _init_controller(self, height):
+        with self.i2c_device:
+            self.i2c_device.write(bytes((
+                _OLED_COMMANDS,
+                0xAE,  # Display off
+                0xD5, 0x80,  # Clock divide
+                0xA8, height - 1,  # Multiplex ratio
+                0xD3, 0x00,  # No display offset
+                0x40,  # Start line 0
+                0x8D, 0x14,  # Charge pump on
+                0x20, 0x00,  # Horizontal addressing
+                0xA1,  # Column 127 is SEG0
+                0xC8,  # Scan COM from the bottom
+                0xDA, 0x12 if height == 64 else 0x02,  # COM pin layout
+                0x81, 0xCF,  # Contrast
+                0xD9, 0xF1,  # Precharge period
+                0xDB, 0x40,  # VCOMH level
+                0xA4,  # Show RAM contents
+                0xA6,  # Not inverted
+                0xAF,  # Display on
+            )))
+
+    @property
+    def idle(self):
+        for page in range(self.pages):
+            if self._dirty_start[page] != _NOT_DIRTY:
+                return False
+        return True
+
+    def encode(self, text):
+        return bytes(text, 'ascii')
+
+    def render(self, lines):
+        """Draw ``lines`` into the framebuffer, one text row per cell
+        height. Lines are padded with blanks or truncated to ``num_cols``."""
+        for row in range(self.num_rows):
+            line = lines[row] if row < len(lines) else ''
+            text = isinstance(line, str)
+            cells = self._cells[row]
+            for col in range(self.num_cols):
+                if col < len(line):
+                    code = ord(line[col]) if text else line[col]
+                    if code > 0xFF:
+                        code = 0x3F  # '?'
+                else:
+                    code = 0x20
+                if cells[col] != code:
+                    cells[col] = code
+                    self._draw_char(row, col, code)
+
+    def _draw_char(self, row, col, code):
+        font = self.font
+        cell_width = font.cell_width
+        glyph = font.offset(code)
+        x = col * cell_width
+        framebuffer = self.framebuffer
+        data = font.data
+        for i in range(font.pages):
+            page = row * font.pages + i
+            offset = page * self.width + x
+            # Byte by byte: slices would allocate a slice object and a copy
+            for j in range(cell_width):
+                framebuffer[offset + j] = data[glyph + j]
+            glyph += cell_width
+        self._mark(row * font.pages, (row + 1) * font.pages, x, x + cell_width)
+
+    def _mark(self, first_page, end_page, start, end):
+        for page in range(first_page, end_page):
+            if self._dirty_start[page] == _NOT_DIRTY:
+                self._dirty_start[page] = start
+                self._dirty_end[page] = end
+            else:
+                self._dirty_start[page] = min(self._dirty_start[page], start)
+                self._dirty_end[page] = max(self._dirty_end[page], end)
+
+    def pump(self, budget_us=None):
+        """
+        Send dirty columns for at most about ``budget_us`` microseconds of
+        bus time. Every data transaction carries at least one glyph's column
+        block, even past the budget: at 100 kHz a window command alone takes
+        longer than a typical budget, and transactions of a byte or two
+        would spend most of the bus time on their overhead.
+
+        :param budget_us: Time budget, or ``None`` for no limit.
+        :returns: True once nothing is dirty.
+        """
+        budget_ns = None if budget_us is None else budget_us * 1000
+        for page in range(self.pages):
+            start = self._dirty_start[page]
+            if start == _NOT_DIRTY:
+                continue
+            if self._pointer_page != page or self._pointer_column != start:
+                self._set_window(page, start)
+                if budget_ns is not None:
+                    budget_ns -= self._transaction_ns + 7 * self._byte_ns
+            end = self._dirty_end[page]
+            if budget_ns is not None:
+                fits = (budget_ns - self._transaction_ns) // self._byte_ns - 1
+                end = min(end, start + max(self.font.cell_width, fits))
+            self._send_data(page, start, end)
+            if end < self._dirty_end[page]:
+                self._dirty_start[page] = end
+                return False
+            self._dirty_start[page] = _NOT_DIRTY
+            if budget_ns is not None:
+                budget_ns -= self._transaction_ns + (1 + end - start) * self._byte_ns
+                if budget_ns <= 0:
+                    return self.idle
+        return True
+
+    def _set_window(self, page, column):
+        # Window from here to the end of the display, so a later write that
+        # continues where this one stopped needs no new window
+        buffer = self._command_buffer
+        buffer[1] = 0x21
+        buffer[2] = column
+        buffer[3] = self.width - 1
+        buffer[4] = 0x22
+        buffer[5] = page
+        buffer[6] = self.pages - 1
+        with self.i2c_device:
+            self.i2c_device.write(buffer)
+        self._pointer_page = page
+        self._pointer_column = column
+
+    def _send_data(self, page, start, end):
+        buffer = self._buffer
+        buffer[0] = _OLED_DATA
+        framebuffer = self.framebuffer
+        offset = page * self.width + start
+        # Byte by byte, as in _draw_char
+        for i in range(end - start):
+            buffer[1 + i] = framebuffer[offset + i]
+        with self.i2c_device:
+            self.i2c_device.write(buffer, end=1 + end - start)
+        if end < self.width:
+            self._pointer_column = end
+        else:
+            # Wrapped to the window's first column on the next page
+            self._pointer_page = -1
+
+    def scroll(self):
+        pass
@@ -0,0 +1,92 @@
+"""Velocity-sensitive acceleration for rotary encoders.
+
+Slow turns map one detent to one step. As the encoder turns faster, each
+detent is worth more steps along a configurable curve, so a quick spin
+covers a whole range while single detents stay precise. All arithmetic is
+in integers: gains are in sixteenths and fractional steps carry over to the
+next movement in the same direction.
+"""
+
+from micropython import const
+
+from scheduler import ticks_ms, ticks_diff
+
+# Gains are fixed point with this many fractional bits
+_GAIN_SHIFT = const(4)
+_GAIN_ONE = const(1 << _GAIN_SHIFT)
+
+# (detents per second, steps per detent in sixteenths): 1:1 up to about
+# two detents per poll at a slow pace, then up to 8 steps per detent
+DEFAULT_CURVE = ((0, 16), (10, 16), (30, 48), (80, 128))
+
+
+class AcceleratedEncoder:
+
+    def __init__(self, encoder, curve=DEFAULT_CURVE, idle_ms=150, clock=ticks_ms):
+        """
+        Turns the position changes of ``encoder`` into accelerated steps.
+
+        Each movement is timestamped, and the speed is the detents moved
+        over the time since the previous movement, averaged with the last
+        estimate. A pause of ``idle_ms`` resets it, so the first detent
+        after a pause is always one step.
+
+        :param encoder: A ``rotaryio.IncrementalEncoder``, or anything with
+            a ``position``.
+        :param curve: ``(detents per second, gain)`` points in ascending
+            speed, with gains in sixteenths of a step per detent. The gain
+            is interpolated between points and held beyond the last one.
+        :param idle_ms: Time without movement after which the speed is
+            taken as zero. Default: 150.
+        :param clock: Function returning the current time in ``ticks_ms``.
+        """
+        self.encoder = encoder
+        self.curve = curve
+        self.idle_ms = idle_ms
+        self.clock = clock
+        # Estimated speed in detents per second
+        self.speed = 0
+        self._position = encoder.position
+        self._moved_ms = clock()
+        # Fractional steps, in sixteenths, waiting to make up a whole step
+        self._carry = 0
+
+    def gain(self, speed):
+        """Steps per detent, in sixteenths, at ``speed`` detents per second."""
+        curve = self.curve
+        if speed <= curve[0][0]:
+            return curve[0][1]
+        for i in range(1, len(curve)):
+            high_speed, high_gain = curve[i]
+            if speed < high_speed:
+                low_speed, low_gain = curve[i - 1]
+                return low_gain + (high_gain - low_gain) * (speed - low_speed) // (high_speed - low_speed)
+        return curve[-1][1]
+
+    def steps(self, now_ms=None):
+        """Accelerated steps for the movement since the last call; negative
+        for the other direction."""
+        position = self.encoder.position
+        delta = position - self._position
+        if not delta:
+            return 0
+        self._position = position
+        if now_ms is None:
+            now_ms = self.clock()
+        elapsed_ms = ticks_diff(now_ms, self._moved_ms)
+        self._moved_ms = now_ms
+        detents = -delta if delta < 0 else delta
+        if elapsed_ms >= self.idle_ms:
+            self.speed = 0
+        else:
+            self.speed = (self.speed + detents * 1000 // max(1, elapsed_ms)) // 2
+        if (self._carry < 0) != (delta < 0):
+            # A change of direction drops the fraction left from the other way
+            self._carry = 0
+        total = self._carry + delta * self.gain(self.speed)
+        # Whole steps, rounded toward zero, and the rest carried over
+        steps = (total if total >= 0 else -total) >> _GAIN_SHIFT
+        if total < 0:
+            steps = -steps
+        self._carry = total - steps * _GAIN_ONE
+        return steps
@@ -0,0 +1,126 @@
+"""Binary event log in a preallocated ring buffer, formatted only when flushed.
+
+Writing a record packs a timestamp, level, event code and two small integer
+arguments into a fixed-size slot. Nothing is allocated and nothing is sent
+to the console. The text is formatted and printed later by `EventLog.flush`,
+from a low-priority task once the log has been quiet for a while.
+
+For compile-time removal, guard call sites with a ``const`` flag::
+
+    LOGGING = const(True)
+    if LOGGING:
+        log.debug(EVENT_KEY_PRESS, key_number)
+
+With the flag set to False the compiler drops the whole statement.
+"""
+
+import struct
+
+import supervisor
+from micropython import const
+
+from scheduler import ticks_ms, ticks_diff
+
+DEBUG = const(10)
+INFO = const(20)
+WARNING = const(30)
+ERROR = const(40)
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Timestamp in ticks_ms, event code, level and two signed 16-bit arguments
+_RECORD = "<IBBhh"
+_RECORD_SIZE = const(10)
+
+
+class EventLog:
+
+    def __init__(self, events, capacity=64, level=DEBUG, quiet_ms=50,
+                 clock=ticks_ms):
+        """
+        Ring buffer of log records that drops the oldest record when full.
+
+        :param events: Format string for each event code, e.g.
+            ``("Key pressed: {}", ...)``. ``{}`` fields take the record's
+            two arguments in order.
+        :param capacity: Records the buffer holds. Default: 64.
+        :param level: Records below this level are not written. Default: DEBUG.
+        :param quiet_ms: `flush` only prints once nothing has been written
+            for this long. Default: 50.
+        :param clock: Function returning the current time in ``ticks_ms``.
+        """
+        self.events = events
+        self.capacity = capacity
+        self.level = level
+        self.quiet_ms = quiet_ms
+        self.clock = clock
+        # Records overwritten before they were flushed
+        self.dropped = 0
+        self._buffer = bytearray(capacity * _RECORD_SIZE)
+        self._head = 0
+        self._count = 0
+        self._last_write_ms = clock()
+
+    def __len__(self):
+        return self._count
+
+    def write(self, level, event, a=0, b=0):
+        if level < self.level:
+            return
+        now_ms = self.clock()
+        self._last_write_ms = now_ms
+        if self._count == self.capacity:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self.dropped += 1
+        slot = (self._head + self._count) % self.capacity
+        struct.pack_into(_RECORD, self._buffer, slot * _RECORD_SIZE, now_ms, event, level, a, b)
+        self._count += 1
+
+    def debug(self, event, a=0, b=0):
+        self.write(DEBUG, event, a, b)
+
+    def info(self, event, a=0, b=0):
+        self.write(INFO, event, a, b)
+
+    def warning(self, event, a=0, b=0):
+        self.write(WARNING, event, a, b)
+
+    def error(self, event, a=0, b=0):
+        self.write(ERROR, event, a, b)
+
+    @property
+    def idle(self):
+        """True once nothing has been written for ``quiet_ms``."""
+        return ticks_diff(self.clock(), self._last_write_ms) >= self.quiet_ms
+
+    def flush(self, max_records=None, force=False):
+        """
+        Print the oldest records to the serial console.
+
+        Does nothing unless the log is `idle` or ``force`` is set. Without
+        a host on the serial console the records are dropped instead.
+
+        :param max_records: Print at most this many records. Default: all.
+        :param force: Print even if records were just written.
+        :returns: The number of records printed.
+        """
+        if not (self._count and (force or self.idle)):
+            return 0
+        if not supervisor.runtime.serial_connected:
+            self.dropped += self._count
+            self._count = 0
+            return 0
+        printed = 0
+        while self._count and (max_records is None or printed < max_records):
+            timestamp, event, level, a, b = struct.unpack_from(
+                _RECORD, self._buffer, self._head * _RECORD_SIZE)
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            print("{:>9} {:<7} {}".format(timestamp, _LEVEL_NAMES[level],
+                                          self.events[event].format(a, b)))
+            printed += 1
+        if self.dropped:
+            print("{} log records dropped".format(self.dropped))
+            self.dropped = 0
+        return printed
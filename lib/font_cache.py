@@ -0,0 +1,116 @@
+"""Glyphs preloaded for the text a display can show, packed in SSD1306 page order.
+
+Fonts loaded with ``adafruit_bitmap_font`` read each glyph from the font
+file the first time it is asked for, which stalls the first frame that
+shows a new character. `GlyphCache` loads exactly the characters of the
+labels it is given, once at boot, packs them into one ``bytearray`` and
+never touches the font again, so unused glyphs are never loaded.
+"""
+
+import font5x7
+
+_FALLBACK = '?'
+
+
+class Glyph:
+    """A glyph as ``adafruit_bitmap_font`` describes one."""
+
+    def __init__(self, bitmap, tile_index, width, height, dx, dy, shift_x, shift_y):
+        self.bitmap = bitmap
+        self.tile_index = tile_index
+        self.width = width
+        self.height = height
+        self.dx = dx
+        self.dy = dy
+        self.shift_x = shift_x
+        self.shift_y = shift_y
+
+
+class _ColumnBitmap:
+    """``bitmap[x, y]`` over a glyph stored as column bytes."""
+
+    def __init__(self, data, offset):
+        self.data = data
+        self.offset = offset
+
+    def __getitem__(self, xy):
+        x, y = xy
+        return self.data[self.offset + x] >> y & 1
+
+
+class BuiltinFont:
+    """The built-in 5x7 font behind the ``adafruit_bitmap_font`` font
+    interface, for when no font file is installed."""
+
+    def get_bounding_box(self):
+        # Width, height and offsets: 7 pixels above the baseline, 1 below
+        return (font5x7.WIDTH, 8, 0, -1)
+
+    def load_glyphs(self, code_points):
+        pass
+
+    def get_glyph(self, code_point):
+        if not font5x7.FIRST <= code_point <= font5x7.LAST:
+            return None
+        offset = (code_point - font5x7.FIRST) * font5x7.WIDTH
+        return Glyph(_ColumnBitmap(font5x7.DATA, offset), 0,
+                     font5x7.WIDTH, 8, 0, -1, font5x7.WIDTH + 1, 0)
+
+
+class GlyphCache:
+
+    def __init__(self, font, text):
+        """
+        Load the glyphs of every character in ``text`` from ``font`` and pack
+        them into fixed-size cells for `displays.SSD1306Display`.
+
+        Each cell is as wide as the widest glyph's advance and as many 8
+        pixel pages high as the font's bounding box. Characters that are
+        not in ``text`` or not in the font are drawn as '?'.
+
+        :param font: A font from ``adafruit_bitmap_font.bitmap_font.load_font``
+            or a `BuiltinFont`.
+        :param text: Every character the display may show, e.g. all labels
+            joined. Duplicates are fine.
+        """
+        chars = sorted(set(text + _FALLBACK))
+        code_points = ''.join(chars)
+        font.load_glyphs(code_points)
+        glyphs = [font.get_glyph(ord(char)) for char in chars]
+
+        _, height, _, y_offset = font.get_bounding_box()
+        ascent = height + y_offset
+        self.pages = (height + 7) // 8
+        self.cell_width = max(glyph.shift_x for glyph in glyphs if glyph is not None)
+        stride = self.pages * self.cell_width
+        self.data = bytearray(stride * len(chars))
+        self._offsets = {}
+
+        for i, glyph in enumerate(glyphs):
+            if glyph is None:
+                continue
+            offset = i * stride
+            self._offsets[ord(chars[i])] = offset
+            top = ascent - (glyph.height + glyph.dy)
+            for x in range(glyph.width):
+                column = glyph.dx + x
+                if not 0 <= column < self.cell_width:
+                    continue
+                for y in range(glyph.height):
+                    row = top + y
+                    if 0 <= row < self.pages * 8 and glyph.bitmap[x, y]:
+                        self.data[offset + (row // 8) * self.cell_width + column] |= 1 << (row % 8)
+        self._fallback = self._offsets.get(ord(_FALLBACK), 0)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def size(self):
+        """Bytes of packed glyph data."""
+        return len(self.data)
+
+    def offset(self, code):
+        """Offset in `data` of the cell for character ``code``: ``pages``
+        rows of ``cell_width`` column bytes."""
+        return self._offsets.get(code, self._fallback)
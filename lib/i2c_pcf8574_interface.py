@@ -20,12 +20,32 @@
 
 """Low-level interface to PCF8574."""
 
+import time
 import busio
 import board
 import microcontroller
+from micropython import const
 from adafruit_bus_device.i2c_device import I2CDevice
 
-from lcd import LCD_4BITMODE, LCD_BACKLIGHT, LCD_NOBACKLIGHT, PIN_ENABLE
+from lcd import LCD_4BITMODE, LCD_BACKLIGHT, LCD_NOBACKLIGHT, PIN_ENABLE, PIN_READ_WRITE
+
+# Busy flag in the status byte read with RS low
+_BUSY_FLAG = const(0x80)
+
+# Bus clocks for one status read: five transactions (start, address, stop)
+# and seven data bytes
+_STATUS_READ_BITS = const(5 * 11 + 7 * 9)
+
+# Each byte is sent as two nibbles of three port writes: enable low, high, low
+_BYTES_PER_VALUE = const(6)
+
+# Values packed into one I2C transaction by write_values()
+_BATCH_VALUES = const(32)
+
+# Wait after a transaction so the last value finishes executing (37 us, plus
+# margin). Inside a transaction the bus time between two values is six bytes,
+# 540 us at the PCF8574's 100 kHz (135 us at 400 kHz), so no delays are needed there.
+_EXECUTION_DELAY_US = const(50)
 
 
 class I2CPCF8574Interface:
@@ -33,7 +53,7 @@ class I2CPCF8574Interface:
     # Bit values to turn backlight on/off. Indexed by a boolean.
     _BACKLIGHT_VALUES = (LCD_NOBACKLIGHT, LCD_BACKLIGHT)
 
-    def __init__(self, i2c, address):
+    def __init__(self, i2c, address, read_busy=False, frequency=100000):
         """
         CharLCD via PCF8574 I2C port expander.
 
@@ -43,14 +63,25 @@ class I2CPCF8574Interface:
             D7 | D6 | D5 | D4 | BL | EN | RW | RS
 
         :param address: The I2C address of your LCD.
+        :param read_busy: Poll the controller's busy flag over the RW pin
+            instead of sleeping for long waits. Switched off again if a
+            read-back fails. Default: False.
+        :param frequency: I2C bus frequency in Hz, used to decide when polling
+            is quicker than sleeping. Default: 100000.
         """
         self.address = address
+        self.read_busy = read_busy
+        # Waits shorter than two status reads are cheaper as a fixed delay
+        self._poll_min_us = 2 * _STATUS_READ_BITS * 1000000 // frequency
 
         self._backlight_pin_state = LCD_BACKLIGHT
 
         self.i2c = i2c
         self.i2c_device = I2CDevice(self.i2c, self.address)
         self.data_buffer = bytearray(1)
+        # Enable-pulse bytes for up to _BATCH_VALUES values, written in one go
+        self._batch = bytearray(_BYTES_PER_VALUE * _BATCH_VALUES)
+        self._status_buffer = bytearray(2)
 
     def deinit(self):
         self.i2c.deinit()
@@ -74,21 +105,105 @@ class I2CPCF8574Interface:
     def send(self, value, rs_mode):
         """Send the specified value to the display in 4-bit nibbles.
         The rs_mode is either ``_RS_DATA`` or ``_RS_INSTRUCTION``."""
-        self._write4bits(rs_mode | (value & 0xF0) | self._backlight_pin_state)
-        self._write4bits(rs_mode | ((value << 4) & 0xF0) | self._backlight_pin_state)
-
-    def _write4bits(self, value):
-        """Pulse the `enable` flag to process value."""
+        self._pack(0, value, rs_mode)
+        with self.i2c_device:
+            self.i2c_device.write(self._batch, end=_BYTES_PER_VALUE)
+        microcontroller.delay_us(_EXECUTION_DELAY_US)
+
+    def send_bytes(self, data, rs_mode, start=0, end=None):
+        """Send ``data[start:end]`` (a bytes-like object) to the display.
+
+        The enable pulses for up to 32 values are packed into one buffer and
+        written in a single I2C transaction, instead of three transactions
+        per nibble."""
+        if end is None:
+            end = len(data)
+        while start < end:
+            start += self.write_values(data, rs_mode, start, end)
+            microcontroller.delay_us(_EXECUTION_DELAY_US)
+
+    def write_values(self, data, rs_mode, start, end):
+        """Write up to 32 values from ``data[start:end]`` in one transaction
+        without waiting for the last one to execute. Returns the number of
+        values written."""
+        count = min(end - start, _BATCH_VALUES)
+        for i in range(count):
+            self._pack(i * _BYTES_PER_VALUE, data[start + i], rs_mode)
         with self.i2c_device:
-            self._i2c_write(value & ~PIN_ENABLE)
-            # This 1us delay is probably unnecessary, given the time needed
-            # to execute the statements.
-            microcontroller.delay_us(1)
-            self._i2c_write(value | PIN_ENABLE)
-            microcontroller.delay_us(1)
-            self._i2c_write(value & ~PIN_ENABLE)
-        # Wait for command to complete.
-        microcontroller.delay_us(100)
+            self.i2c_device.write(self._batch, end=count * _BYTES_PER_VALUE)
+        return count
+
+    def wait_us(self, us):
+        """Block for ``us`` microseconds while the controller executes. In
+        read-back mode, long waits poll the busy flag and return as soon as
+        the controller is ready."""
+        if self.read_busy and us >= self._poll_min_us:
+            # Anything still busy after twice the worst case means the RW
+            # pin is not wired up
+            if self.wait_ready(2 * us):
+                return
+        microcontroller.delay_us(us)
+
+    def wait_ready(self, timeout_us):
+        """Poll the busy flag until the controller is ready.
+
+        Returns True once it is. Returns False if the read failed or the
+        controller was still busy after ``timeout_us``; read-back mode is
+        then switched off so later waits use fixed delays."""
+        deadline = time.monotonic_ns() + timeout_us * 1000
+        while True:
+            status = self.read_status()
+            if status is None:
+                break
+            if not status & _BUSY_FLAG:
+                return True
+            if time.monotonic_ns() >= deadline:
+                break
+        self.read_busy = False
+        return False
+
+    def read_status(self):
+        """Read the busy flag (bit 7) and address counter (bits 0-6) by
+        driving RW high. Returns ``None`` if the I2C read fails."""
+        return self.read_value(0)
+
+    def read_value(self, rs_mode):
+        """Read one byte from the controller by driving RW high: the status
+        with ``rs_mode`` 0, or the RAM byte at the address counter (which
+        then steps) with ``rs_mode`` 1. Returns ``None`` if the I2C read
+        fails."""
+        # Data pins written high act as inputs the controller can pull low
+        idle = 0xF0 | PIN_READ_WRITE | rs_mode | self._backlight_pin_state
+        buffer = self._status_buffer
+        buffer[0] = idle
+        buffer[1] = idle | PIN_ENABLE
+        try:
+            with self.i2c_device:
+                # High nibble is driven while enable is high
+                self.i2c_device.write(buffer)
+                self.i2c_device.readinto(self.data_buffer)
+                high = self.data_buffer[0]
+                # Lower enable, then pulse it again for the low nibble
+                self.i2c_device.write(buffer)
+                self.i2c_device.readinto(self.data_buffer)
+                low = self.data_buffer[0]
+                self.i2c_device.write(buffer, end=1)
+        except OSError:
+            return None
+        return (high & 0xF0) | (low >> 4)
+
+    def _pack(self, offset, value, rs_mode):
+        """Pack the six port writes that clock ``value`` into the controller
+        into the batch buffer at ``offset``."""
+        batch = self._batch
+        high = rs_mode | (value & 0xF0) | self._backlight_pin_state
+        low = rs_mode | ((value << 4) & 0xF0) | self._backlight_pin_state
+        batch[offset] = high & ~PIN_ENABLE
+        batch[offset + 1] = high | PIN_ENABLE
+        batch[offset + 2] = high & ~PIN_ENABLE
+        batch[offset + 3] = low & ~PIN_ENABLE
+        batch[offset + 4] = low | PIN_ENABLE
+        batch[offset + 5] = low & ~PIN_ENABLE
 
     def _i2c_write(self, value):
         self.data_buffer[0] = value
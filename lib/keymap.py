@@ -0,0 +1,109 @@
+"""Table-driven keymap engine.
+
+Each mode's bindings are compiled once at boot into an indexed table of
+prebuilt actions, so dispatching a key press is a single lookup no matter
+which key or mode is active. Each action also carries its full 8-byte HID
+report, built once here so a press is a buffer copy and a ``send_report``.
+"""
+
+from adafruit_hid.keyboard import Keyboard
+from adafruit_hid.keycode import Keycode
+
+_MAX_KEYPRESSES = 6
+_EMPTY_REPORT = bytes(8)
+
+
+def build_report(keycodes):
+    """Build the keyboard report that ``Keyboard.press(*keycodes)`` would send
+    from an idle keyboard.
+
+    :raises ValueError: if more than six regular keys are given.
+    """
+    report = bytearray(8)
+    slot = 2
+    for keycode in keycodes:
+        modifier = Keycode.modifier_bit(keycode)
+        if modifier:
+            report[0] |= modifier
+        elif keycode not in report[2:slot]:
+            if slot == 2 + _MAX_KEYPRESSES:
+                raise ValueError('No more than six regular keys may be pressed at once.')
+            report[slot] = keycode
+            slot += 1
+    return bytes(report)
+
+
+class ReportKeyboard(Keyboard):
+    """`Keyboard` that can send a prebuilt report without per-keycode work."""
+
+    def press_report(self, report, keycodes):
+        """Send ``report`` as the current key state.
+
+        The prebuilt report is copied straight into ``self.report`` when no
+        other key is held. Otherwise ``keycodes`` are merged into the held
+        state the usual way so chords across keys still work.
+        """
+        if self.report == _EMPTY_REPORT:
+            # Byte by byte: a slice assignment allocates a slice object
+            held = self.report
+            for i in range(len(held)):
+                held[i] = report[i]
+            self._keyboard_device.send_report(held)
+        else:
+            self.press(*keycodes)
+
+
+class Action:
+    """A prebuilt key binding.
+
+    :param label: Short human-readable name, used for logging.
+    :param keycodes: Keycodes pressed together when the key goes down.
+    """
+
+    def __init__(self, label, keycodes):
+        self.label = label
+        self.keycodes = tuple(keycodes)
+        self.report = build_report(self.keycodes)
+
+    def press(self, kbd):
+        """Press this binding on ``kbd``, a `ReportKeyboard`."""
+        kbd.press_report(self.report, self.keycodes)
+
+
+class Keymap:
+
+    def __init__(self, modes, num_keys):
+        """
+        Compiled keymap for a key matrix.
+
+        Modes are given as data: a sequence of ``(name, bindings)`` pairs where
+        ``bindings`` is indexed by key number and holds ``(label, keycodes)``
+        pairs, or ``None`` for an unbound key. Missing trailing keys are unbound.
+
+        :param modes: Sequence of ``(name, bindings)`` pairs, one per mode.
+        :param num_keys: Number of keys on the matrix.
+        """
+        if not modes:
+            raise ValueError('At least one mode is required.')
+        self.num_keys = num_keys
+        self.names = tuple(name for name, _ in modes)
+
+        table = []
+        for name, bindings in modes:
+            if len(bindings) > num_keys:
+                raise ValueError('Mode {} binds {} keys, matrix has {}.'.format(
+                    name, len(bindings), num_keys))
+            row = [None] * num_keys
+            for key_number, binding in enumerate(bindings):
+                if binding is not None:
+                    row[key_number] = Action(*binding)
+            table.append(tuple(row))
+        self._table = tuple(table)
+
+    def __len__(self):
+        """The number of modes."""
+        return len(self._table)
+
+    def lookup(self, mode, key_number):
+        """Return the `Action` bound to ``key_number`` in ``mode``, or ``None``."""
+        return self._table[mode][key_number]
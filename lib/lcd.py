@@ -18,7 +18,6 @@
 # IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
 # CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import time
 from micropython import const
 
 # Commands
@@ -67,6 +66,25 @@ LCD_NOBACKLIGHT = const(0x00)
 _RS_INSTRUCTION = const(0x00)
 _RS_DATA = const(0x01)
 
+# Cells per DDRAM line in 2-line mode; shifting the display wraps around it
+_DDRAM_LINE_LENGTH = const(40)
+
+# Written to the last two cells of the second DDRAM line to recognise an
+# initialized controller on warm start. They are off screen on 2 row
+# displays and 16x4, but not 20x4, where the fourth row ends there. Both
+# codes are blank in the common A00 character ROM, so they stay invisible
+# when a marquee scrolls them into view.
+_WARM_SIGNATURE = b'\xa0\x80'
+_WARM_SIGNATURE_ADDRESS = const(0x66)
+_WARM_SIGNATURE_COL = const(38)
+
+# A gap of unchanged cells this short is rewritten instead of moving the cursor
+_MAX_RENDER_GAP = const(1)
+
+# Line types whose content can change while the object stays the same. Built
+# once: a tuple written in the isinstance call would be allocated per call.
+_MUTABLE_LINES = (bytearray, memoryview)
+
 # Pin bitmasks
 PIN_ENABLE = const(0x4)
 PIN_READ_WRITE = const(0x2)
@@ -82,15 +100,24 @@ MILLISECOND = 1e-3
 
 class LCD(object):
 
-    def __init__(self, interface, num_cols=20, num_rows=4, char_height=8):
+    def __init__(self, interface, num_cols=20, num_rows=4, char_height=8, warm_start=False,
+                 charset=None):
         """
         Character LCD controller.
         
-        :param interface: Communication interface, such as I2CInterface
+        :param interface: Communication interface, such as I2CPCF8574Interface.
+            Waits for the controller are made through its ``wait_us`` method.
         :param num_rows: Number of display rows (usually 1, 2 or 4). Default: 4.
         :param num_cols: Number of columns per row (usually 16 or 20). Default 20.
         :param char_height: Some 1 line displays allow a font height of 10px.
                 Allowed: 8 or 10. Default: 8.
+        :param warm_start: Skip the reset sequence when the controller is
+                still initialized from before a soft reload. Needs an
+                interface with ``read_value`` and the RW pin wired. Ignored
+                on displays that would show the signature it keeps in DDRAM:
+                1 row, or 4 rows of more than 19 columns. Default: False.
+        :param charset: `lcd_charset.Charset` that encodes ``str`` text, or
+                ``None`` to send each character's ``ord()``. Default: None.
         """
         self.interface = interface
         
@@ -103,6 +130,24 @@ class LCD(object):
         
         # get row addresses (varies based on display size)
         self._row_offsets = (0x00, 0x40, self.num_cols, 0x40 + self.num_cols)
+
+        # What the display currently shows, one bytearray per row. Kept in
+        # step with every write so render() can send only changed cells.
+        # Displays of up to 2 rows keep their whole DDRAM line for marquee().
+        shadow_cols = _DDRAM_LINE_LENGTH if num_rows <= 2 else num_cols
+        self._shadow = [bytearray(b' ' * shadow_cols) for _ in range(num_rows)]
+        # Cells the display is shifted left by, see shift_display()
+        self._shift = 0
+        # Reused by print() to batch one row segment at a time
+        self._print_buffer = bytearray(num_cols)
+        # Immutable line objects render() last drew on each row unchanged
+        self._rendered = [None] * num_rows
+        # Reused by render() and marquee() to encode str lines
+        self._line_buffer = bytearray(shadow_cols)
+        self._code = ord if charset is None else charset.code
+        # Set when the address counter is left off the cursor, by CGRAM
+        # writes or marquee(); the cursor is moved back before the next write
+        self._address_lost = False
  
         # Setup initial display configuration
         displayfunction = self.interface.data_bus_mode | _LCD_5x8DOTS
@@ -115,42 +160,69 @@ class LCD(object):
             # For some 1 line displays you can select a 10px font.
             displayfunction |= _LCD_5x10DOTS
 
+        self._warm_start = warm_start and self._signature_hidden()
+        if not (self._warm_start and self._is_initialized()):
+            self._reset(displayfunction)
+
+        # Write configuration to display
+        self.command(_LCD_FUNCTIONSET | displayfunction)
+        self.interface.wait_us(50)
+
+        # Configure entry mode. Define internal fields.
+        self.command(_LCD_ENTRYMODESET | _LCD_ENTRYLEFT)
+        self.interface.wait_us(50)
+
+        # Configure display mode. Define internal fields.
+        self._display_mode = _LCD_DISPLAYON
+        self._cursor_mode = CursorMode.HIDE
+        self.command(_LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
+        self.interface.wait_us(50)
+
+        self.clear()
+
+    def _signature_hidden(self):
+        """Whether the warm-start signature is outside every visible row."""
+        if self.num_rows == 1:
+            # 1 line mode has no DDRAM at the signature's address
+            return False
+        for row in range(self.num_rows):
+            start = self._row_offsets[row]
+            if start <= _WARM_SIGNATURE_ADDRESS < start + self.num_cols:
+                return False
+        return True
+
+    def _is_initialized(self):
+        """Whether the controller still holds the warm-start signature, which
+        only survives while it stays powered and in 4-bit mode."""
+        self.command(_LCD_SETDDRAMADDR | _WARM_SIGNATURE_ADDRESS)
+        self.interface.wait_us(50)
+        for expected in _WARM_SIGNATURE:
+            if self.interface.read_value(_RS_DATA) != expected:
+                return False
+        return True
+
+    def _reset(self, displayfunction):
+        """Hitachi reset sequence: put the controller into a known bus mode."""
         # Choose 4 or 8 bit mode
         self.command(0x03)
-        time.sleep(4.5*MILLISECOND)
+        self.interface.wait_us(4500)
         self.command(0x03)
-        time.sleep(4.5*MILLISECOND)
+        self.interface.wait_us(4500)
         self.command(0x03)
         if self.interface.data_bus_mode == LCD_4BITMODE:
             # Hitachi manual page 46
-            time.sleep(100*MICROSECOND)
+            self.interface.wait_us(100)
             self.command(0x02)
         elif self.interface.data_bus_mode == _LCD_8BITMODE:
             # Hitachi manual page 45
             self.command(0x30)
-            time.sleep(4.5*MILLISECOND)
+            self.interface.wait_us(4500)
             self.command(0x30)
-            time.sleep(100*MICROSECOND)
+            self.interface.wait_us(100)
             self.command(0x30)
         else:
             raise ValueError('Invalid data bus mode: {}'.format(self.interface.data_bus_mode))
 
-        # Write configuration to display
-        self.command(_LCD_FUNCTIONSET | displayfunction)
-        time.sleep(50*MICROSECOND)
-
-        # Configure entry mode. Define internal fields.
-        self.command(_LCD_ENTRYMODESET | _LCD_ENTRYLEFT)
-        time.sleep(50*MICROSECOND)
-
-        # Configure display mode. Define internal fields.
-        self._display_mode = _LCD_DISPLAYON
-        self._cursor_mode = CursorMode.HIDE
-        self.command(_LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        time.sleep(50*MICROSECOND)
-
-        self.clear()
-
     def close(self):
         self.interface.deinit()
 
@@ -160,15 +232,17 @@ class LCD(object):
     def set_display_enabled(self, value):
         self._display_mode = _LCD_DISPLAYON if value else _LCD_DISPLAYOFF
         self.command(_LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        time.sleep(50*MICROSECOND)
+        self.interface.wait_us(50)
 
     def set_cursor_mode(self, value):
         self._cursor_mode = value
         self.command(_LCD_DISPLAYCONTROL | self._display_mode | self._cursor_mode)
-        time.sleep(50*MICROSECOND)
+        self.interface.wait_us(50)
 
     def cursor_pos(self):
-        """The cursor position as a 2-tuple (row, col)."""
+        """The cursor position as a 2-tuple (row, col). The column equals
+        ``num_cols`` after the last cell of a row was written; the cursor
+        moves to the next row on the next write."""
         return (self._row, self._col)
 
     def set_cursor_pos(self, row, col):
@@ -176,10 +250,25 @@ class LCD(object):
             raise ValueError('row should be in range 0-{}'.format(self.num_rows - 1))
         if not (0 <= col < self.num_cols):
             raise ValueError('col should be in range 0-{}'.format(self.num_cols - 1))
+        self._set_address(row, col)
+
+    def _set_address(self, row, col):
+        """Move the cursor to ``col`` of ``row``, which may lie in the
+        off-screen part of the DDRAM line."""
         self._row = row
         self._col = col
+        self._address_lost = False
         self.command(_LCD_SETDDRAMADDR | self._row_offsets[row] + col)
-        time.sleep(50*MICROSECOND)
+        self.interface.wait_us(50)
+
+    def _restore_cursor(self):
+        """Point the address counter back at the cursor after a CGRAM write
+        or a marquee."""
+        if self._address_lost:
+            if self._col == self.num_cols:
+                self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
+            else:
+                self.set_cursor_pos(self._row, self._col)
 
     def print(self, string):
         """
@@ -187,30 +276,195 @@ class LCD(object):
         A newline ('\n') will advance to the left side of the next row.
         Lines that are too long automatically continue on next line.
 
-        Only characters with an ``ord()`` value between 0 and 255 are currently
-        supported.
+        ``string`` may also be ``bytes``, ``bytearray`` or ``memoryview`` of
+        character codes, e.g. a label encoded once with
+        `lcd_charset.Charset.encode`, which is sent as is.
+
+        Without a ``charset``, only characters with an ``ord()`` value
+        between 0 and 255 are supported.
 
         """
+        # Characters are collected per row segment and sent as one batch.
+        # The controller advances its address itself, so the cursor is only
+        # moved at a newline or when a row is full.
+        self._restore_cursor()
+        if not isinstance(string, str):
+            self._print_codes(string)
+            return
+        code = self._code
+        buffer = self._print_buffer
+        count = 0
         for char in string:
             if char == '\n':
+                self._write_run(buffer, 0, count)
+                count = 0
                 # Advance to next row, at left side. Wrap around to top row if at bottom.
                 self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
-            else:
-                self.write(ord(char))
+                continue
+            if self._col + count == self.num_cols:
+                # Row full: the next DDRAM row is not contiguous with this one
+                self._write_run(buffer, 0, count)
+                count = 0
+                self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
+            buffer[count] = code(char)
+            count += 1
+        self._write_run(buffer, 0, count)
+
+    def _print_codes(self, data):
+        """print() for encoded text: runs of ``data`` are sent straight from it."""
+        start = 0
+        for i in range(len(data)):
+            if data[i] == 0x0A:
+                self._write_run(data, start, i)
+                start = i + 1
+                self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
+            elif self._col + i - start == self.num_cols:
+                self._write_run(data, start, i)
+                start = i
+                self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
+        self._write_run(data, start, len(data))
+
+    def _write_run(self, data, start, end):
+        """Send ``data[start:end]`` at the cursor, which must leave it on the
+        current row."""
+        if start < end:
+            self.interface.send_bytes(data, _RS_DATA, start, end)
+            col = self._col
+            self._shadow[self._row][col:col + end - start] = data[start:end]
+            self._rendered[self._row] = None
+            self._col = col + end - start
+
+    def render(self, lines):
+        """
+        Show ``lines``, one string per row, changing only the cells that
+        differ from what is already on the display.
+
+        Lines are padded with blanks or truncated to the row width; missing
+        rows are blanked. Unchanged cells cost no bus traffic. A run of
+        changed cells is written with a single cursor move and one batched
+        transfer, and a one-cell gap between runs is rewritten rather than
+        paying for another move.
+
+        A line may be ``bytes``, ``bytearray`` or ``memoryview`` of character
+        codes, encoded once with `lcd_charset.Charset.encode`. A row given
+        the same ``bytes`` or ``str`` object as in the last frame is not
+        even compared.
+
+        Without a ``charset``, only characters with an ``ord()`` value
+        between 0 and 255 are supported.
+        """
+        if self._shift:
+            # Undo a marquee's scrolling
+            self.home()
+        for row in range(self.num_rows):
+            line = lines[row] if row < len(lines) else ''
+            if line is self._rendered[row] and not isinstance(line, _MUTABLE_LINES):
+                # Same immutable line as last frame, and nothing drew over it
+                continue
+            self._render_row(row, line, self.num_cols)
+            self._rendered[row] = line
+
+    def marquee(self, lines):
+        """
+        Show ``lines``, one string per row, across the whole 40-cell DDRAM
+        line of each row, to scroll with `shift_display`. Each step is then
+        a single command, instead of rewriting the visible cells.
+
+        Like `render`, only changed cells are sent, and the current shift is
+        kept, so the marquee can be updated while it scrolls. The controller
+        shifts all rows together. `render` undoes the shift again.
 
+        With ``warm_start``, the last two cells of the second row hold the
+        warm-start signature and are not available.
+
+        :raises ValueError: When the display has more than 2 rows (rows 3
+            and 4 share DDRAM lines with rows 1 and 2), or a line is too long.
+        """
+        if self.num_rows > 2:
+            raise ValueError('A marquee needs a display with at most 2 rows.')
+        for row in range(self.num_rows):
+            line = lines[row] if row < len(lines) else ''
+            width = _WARM_SIGNATURE_COL if self._warm_start and row == 1 else _DDRAM_LINE_LENGTH
+            if len(line) > width:
+                raise ValueError('Row {} of a marquee holds at most {} characters.'.format(row, width))
+            self._render_row(row, line, width)
+            self._rendered[row] = None
+        if self._col > self.num_cols:
+            # Off screen: continue like after filling the row
+            self._col = self.num_cols
+            self._address_lost = True
+
+    def _render_row(self, row, line, width):
+        """Bring the first ``width`` cells of ``row`` up to date with ``line``."""
+        shadow = self._shadow[row]
+        if isinstance(line, str):
+            length = self._encode_into(line, self._line_buffer)
+            line = self._line_buffer
+        else:
+            length = len(line)
+        # Column the address counter points at on this row, or -1, and
+        # where the run of cells waiting to be sent from there starts
+        cursor = self._col if self._row == row and not self._address_lost else -1
+        run_start = cursor
+        for col in range(width):
+            value = line[col] if col < length else 0x20
+            if shadow[col] == value:
+                continue
+            shadow[col] = value
+            if cursor != col and not (0 <= cursor < col and col - cursor <= _MAX_RENDER_GAP):
+                self._send_run(row, run_start, cursor)
+                self._set_address(row, col)
+                run_start = col
+            # Otherwise the unchanged gap cells go out again with the run,
+            # which is no more traffic than a cursor move
+            cursor = col + 1
+        self._send_run(row, run_start, cursor)
+
+    def _encode_into(self, text, buffer):
+        """Encode ``text`` into ``buffer``; returns the number of codes."""
+        count = min(len(text), len(buffer))
+        code = self._code
+        for i in range(count):
+            buffer[i] = code(text[i])
+        return count
+
+    def _send_run(self, row, start, end):
+        """Send shadow cells ``start:end`` of ``row`` in one batch; the cursor
+        is already at ``start``."""
+        if start < end:
+            self.interface.send_bytes(self._shadow[row], _RS_DATA, start, end)
+            self._row = row
+            self._col = end
 
     def clear(self):
         """Overwrite display with blank characters and reset cursor position."""
         self.command(_LCD_CLEARDISPLAY)
-        time.sleep(2*MILLISECOND)
-        self.home()
+        for shadow_row in self._shadow:
+            shadow_row[:] = b' ' * len(shadow_row)
+        self._rendered = [None] * self.num_rows
+        self.interface.wait_us(2000)
+        # Clearing already homes the cursor and undoes shifting
+        self._row = 0
+        self._col = 0
+        self._shift = 0
+        self._address_lost = False
+        if self._warm_start:
+            # Put back the signature the clear erased
+            self.command(_LCD_SETDDRAMADDR | _WARM_SIGNATURE_ADDRESS)
+            self.interface.wait_us(50)
+            self.interface.send_bytes(_WARM_SIGNATURE, _RS_DATA)
+            if self.num_rows == 2:
+                self._shadow[1][_WARM_SIGNATURE_COL:] = _WARM_SIGNATURE
+            self.set_cursor_pos(0, 0)
 
     def home(self):
         """Set cursor to initial position and reset any shifting."""
         self.command(_LCD_RETURNHOME)
         self._row = 0
         self._col = 0
-        time.sleep(2*MILLISECOND)
+        self._shift = 0
+        self._address_lost = False
+        self.interface.wait_us(2000)
 
     def shift_display(self, amount):
         """Shift the display. Use negative amounts to shift left and positive
@@ -220,7 +474,8 @@ class LCD(object):
         direction = _LCD_MOVERIGHT if amount > 0 else _LCD_MOVELEFT
         for i in range(abs(amount)):
             self.command(_LCD_CURSORSHIFT | _LCD_DISPLAYMOVE | direction)
-            time.sleep(50*MICROSECOND)
+            self.interface.wait_us(50)
+        self._shift = (self._shift - amount) % _DDRAM_LINE_LENGTH
 
     def create_char(self, location, bitmap):
         """Create a new character.
@@ -257,33 +512,35 @@ class LCD(object):
             raise ValueError('Only locations 0-7 are valid.')
         if len(bitmap) != 8:
             raise ValueError('Bitmap should have exactly 8 rows.')
+        self.write_cgram(location, bitmap)
 
-        # Store previous position
-        save_row = self._row
-        save_col = self._col
+    def write_cgram(self, location, data, start=0, end=None):
+        """Write custom characters from ``location`` on in one batch.
 
-        # Write character to CGRAM
+        ``data[start:end]`` holds 8 rows per character and may run over
+        several consecutive locations. The cursor is not moved back here but
+        before the next write to the display, so several CGRAM writes in a
+        row cost no cursor moves in between.
+        """
         self.command(_LCD_SETCGRAMADDR | location << 3)
-        for row in bitmap:
-            self.interface.send(row, _RS_DATA)
-
-        # Restore cursor pos
-        self.set_cursor_pos(save_row, save_col)
+        self.interface.wait_us(50)
+        self.interface.send_bytes(data, _RS_DATA, start, end)
+        self._address_lost = True
 
     def command(self, value):
         """Send a raw command to the LCD."""
         self.interface.send(value, _RS_INSTRUCTION)
 
     def write(self, value):
-        """Write a raw character byte to the LCD."""
+        """Write a raw character byte to the LCD.
+
+        The controller advances the cursor itself; a cursor move is only sent
+        when the previous write filled the row, to reach the next row."""
+        self._restore_cursor()
+        if self._col == self.num_cols:
+            # Go to left side next row. Wrap around to first row if on last row.
+            self.set_cursor_pos((self._row + 1) % self.num_rows, 0)
         self.interface.send(value, _RS_DATA)
-        if self._col < self.num_cols - 1:
-            # Char was placed on current line. No need to reposition cursor.
-            self._col += 1
-        else:
-            # At end of line: go to left side next row. Wrap around to first row if on last row.
-            self._row = (self._row + 1) % self.num_rows
-            self._col = 0
-
-        self.set_cursor_pos(self._row, self._col)
-
+        self._shadow[self._row][self._col] = value
+        self._rendered[self._row] = None
+        self._col += 1
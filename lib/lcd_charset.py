@@ -0,0 +1,89 @@
+"""Encoding of unicode text into HD44780 character ROM codes."""
+
+from micropython import const
+
+_FALLBACK = const(0x3F)  # '?'
+
+# Characters of the A00 (Japanese) ROM, the one fitted to most HD44780
+# modules, that are not at their unicode code point. Its 0x5C is a yen
+# sign and 0x7E/0x7F are arrows, so backslash and tilde have no code.
+A00 = {
+    '\\': None,
+    '~': None,
+    '¥': 0x5C,
+    '→': 0x7E,
+    '←': 0x7F,
+    '·': 0xA5,
+    'α': 0xE0,
+    'ä': 0xE1,
+    'β': 0xE2,
+    'ε': 0xE3,
+    'μ': 0xE4,
+    'µ': 0xE4,
+    'σ': 0xE5,
+    'ρ': 0xE6,
+    '√': 0xE8,
+    '¢': 0xEC,
+    'ñ': 0xEE,
+    'ö': 0xEF,
+    '°': 0xDF,
+    'θ': 0xF2,
+    '∞': 0xF3,
+    'Ω': 0xF4,
+    'ü': 0xF5,
+    'Σ': 0xF6,
+    'π': 0xF7,
+    '÷': 0xFD,
+    '█': 0xFF,
+}
+
+
+class Charset:
+
+    def __init__(self, table=A00, fallback=_FALLBACK):
+        """
+        Maps unicode characters to character ROM codes.
+
+        Characters below 0x80 map to themselves, which includes the custom
+        CGRAM characters 0-7, unless ``table`` says otherwise. Anything else
+        must be in ``table``. Characters without a code become ``fallback``.
+
+        Encode labels once, at load time, with `encode` and hand the bytes
+        to `lcd.LCD.print` or `lcd.LCD.render`, which then send them as is.
+
+        :param table: Dict of character to code, or ``None`` for no code.
+            Default: the A00 ROM.
+        :param fallback: Code for characters without one. Default: '?'.
+        """
+        self.fallback = fallback
+        self._table = dict(table)
+
+    def add(self, char, code):
+        """Map ``char`` to ``code``, e.g. a custom CGRAM character 0-7."""
+        self._table[char] = code
+
+    def code(self, char):
+        """The ROM code for the single character ``char``."""
+        code = self._table.get(char, -1)
+        if code is None:
+            return self.fallback
+        if code < 0:
+            code = ord(char)
+            if code >= 0x80:
+                return self.fallback
+        return code
+
+    def encode(self, text):
+        """``text`` as ROM codes, in a new ``bytes``."""
+        buffer = bytearray(len(text))
+        self.encode_into(text, buffer)
+        return bytes(buffer)
+
+    def encode_into(self, text, buffer, start=0):
+        """Encode ``text`` into ``buffer`` from index ``start``, without
+        allocating. Returns the number of codes written, which stops at the
+        end of ``buffer``."""
+        count = min(len(text), len(buffer) - start)
+        for i in range(count):
+            buffer[start + i] = self.code(text[i])
+        return count
@@ -0,0 +1,110 @@
+"""Named custom glyphs for the character LCD, mapped onto its 8 CGRAM slots on demand."""
+
+from micropython import const
+
+_SLOTS = const(8)
+_ROWS = const(8)
+
+
+class GlyphManager:
+
+    def __init__(self, display, glyphs=None):
+        """
+        Keeps any number of named 5x8 glyphs and loads them into the
+        display's CGRAM slots as frames use them, evicting the least recently
+        used glyph when all slots are taken.
+
+        Per frame, call `char` for every glyph the frame shows, then `flush`
+        to upload the slots that changed, then draw the frame::
+
+            line = glyphs.char("die_5") + " rolled"
+            glyphs.flush()
+            display.render((line, ""))
+
+        :param display: The `lcd.LCD` to load glyphs into.
+        :param glyphs: Optional dict of glyph name to bitmap to `add`.
+        """
+        self.display = display
+        self._bitmaps = {}
+        self._slot_of = {}
+        self._slot_names = [None] * _SLOTS
+        # Frame each slot was last used in; -1 for never
+        self._last_used = [-1] * _SLOTS
+        self._frame = 0
+        # What the CGRAM holds, valid for slots in the _loaded bitmask
+        self._cgram = bytearray(_SLOTS * _ROWS)
+        self._loaded = 0
+        self._dirty = 0
+        if glyphs:
+            for name, bitmap in glyphs.items():
+                self.add(name, bitmap)
+
+    def add(self, name, bitmap):
+        """Register glyph ``name``: 8 rows of 5 pixels, as for
+        `lcd.LCD.create_char`. Replacing a loaded glyph reloads its slot."""
+        if len(bitmap) != _ROWS:
+            raise ValueError('Bitmap should have exactly 8 rows.')
+        bitmap = bytes(bitmap)
+        self._bitmaps[name] = bitmap
+        slot = self._slot_of.get(name)
+        if slot is not None:
+            self._load(slot, bitmap)
+
+    def char(self, name):
+        """The character that shows glyph ``name`` in the current frame.
+
+        Loads the glyph into a slot if it is not in one. A slot is only
+        rewritten when its contents change.
+
+        :raises ValueError: When the frame uses more than 8 glyphs.
+        """
+        slot = self._slot_of.get(name)
+        if slot is None:
+            bitmap = self._bitmaps[name]
+            slot = self._least_recently_used()
+            old_name = self._slot_names[slot]
+            if old_name is not None:
+                del self._slot_of[old_name]
+            self._slot_names[slot] = name
+            self._slot_of[name] = slot
+            self._load(slot, bitmap)
+        self._last_used[slot] = self._frame
+        return chr(slot)
+
+    def flush(self):
+        """Upload every slot changed this frame in one CGRAM transfer and
+        start the next frame. Returns True if anything was sent."""
+        dirty = self._dirty
+        self._frame += 1
+        if not dirty:
+            return False
+        first = 0
+        while not dirty & 1 << first:
+            first += 1
+        last = _SLOTS - 1
+        while not dirty & 1 << last:
+            last -= 1
+        # Clean slots between dirty ones are rewritten too: cheaper than
+        # another CGRAM address command and transfer
+        self.display.write_cgram(first, self._cgram, first * _ROWS, (last + 1) * _ROWS)
+        self._loaded |= dirty
+        self._dirty = 0
+        return True
+
+    def _least_recently_used(self):
+        frame = self._frame
+        best = -1
+        for slot in range(_SLOTS):
+            last_used = self._last_used[slot]
+            if last_used != frame and (best < 0 or last_used < self._last_used[best]):
+                best = slot
+        if best < 0:
+            raise ValueError('Only {} glyphs fit in one frame.'.format(_SLOTS))
+        return best
+
+    def _load(self, slot, bitmap):
+        start = slot * _ROWS
+        if self._loaded & 1 << slot and self._cgram[start:start + _ROWS] == bitmap:
+            return
+        self._cgram[start:start + _ROWS] = bitmap
+        self._dirty |= 1 << slot
@@ -0,0 +1,190 @@
+"""Queued, non-blocking front end for an LCD interface.
+
+`QueuedInterface` stands in for the interface given to ``lcd.LCD``. Values
+and waits are queued instead of being sent with blocking delays, and
+`QueuedInterface.pump` sends as much as fits in a time budget, only when
+the controller is ready.
+
+Waits are kept in ``ticks_ms`` and small integers rather than
+``time.monotonic_ns``, whose long int results allocate on every call.
+"""
+
+from array import array
+
+import microcontroller
+from micropython import const
+
+from scheduler import ticks_ms, ticks_diff
+
+# Time the controller needs after a transaction before it takes the next one
+_SETTLE_US = const(50)
+
+# Enable-pulse bytes per value on a PCF8574 backpack, and bits per byte on I2C
+_BYTES_PER_VALUE = const(6)
+_BITS_PER_BYTE = const(9)
+
+# Values sent per transaction at most, as in I2CPCF8574Interface.write_values
+_MAX_BATCH = const(32)
+
+# The rest of a wait this short is spun out instead of waiting for later
+# ticks. Longer ones, e.g. clearing the display, leave the queue for then.
+_SPIN_US = const(100)
+
+
+class QueuedInterface:
+
+    def __init__(self, interface, capacity=128, frequency=100000):
+        """
+        Queue in front of an interface such as ``I2CPCF8574Interface``.
+
+        :param interface: The interface that talks to the controller. It must
+            provide ``write_values``.
+        :param capacity: Number of values the queue holds. Default: 128.
+        :param frequency: I2C bus frequency in Hz, used to estimate how many
+            values fit in a pump budget. Default: 100000.
+        """
+        self.interface = interface
+        self.capacity = capacity
+        self._values = bytearray(capacity)
+        self._modes = bytearray(capacity)
+        # Microseconds the controller needs after each value
+        self._waits = array('H', bytes(2 * capacity))
+        self._head = 0
+        self._count = 0
+        # Time of the last transaction, and how long the controller needs
+        # after it in microseconds
+        self._sent_ms = ticks_ms()
+        self._wait_us = 0
+        self._value_ns = _BYTES_PER_VALUE * _BITS_PER_BYTE * 1000000000 // frequency
+
+    @property
+    def data_bus_mode(self):
+        return self.interface.data_bus_mode
+
+    @property
+    def backlight(self):
+        return self.interface.backlight
+
+    @backlight.setter
+    def backlight(self, value):
+        # Only the backlight pin changes; safe to write between queued values
+        self.interface.backlight = value
+
+    @property
+    def idle(self):
+        """True when nothing is waiting to be sent."""
+        return self._count == 0
+
+    def __len__(self):
+        return self._count
+
+    def deinit(self):
+        self.interface.deinit()
+
+    def send(self, value, rs_mode):
+        """Queue ``value``. Blocks only if the queue is full."""
+        if self._count == self.capacity:
+            self.flush()
+        tail = (self._head + self._count) % self.capacity
+        self._values[tail] = value
+        self._modes[tail] = rs_mode
+        self._waits[tail] = 0
+        self._count += 1
+
+    def send_bytes(self, data, rs_mode, start=0, end=None):
+        """Queue ``data[start:end]``."""
+        if end is None:
+            end = len(data)
+        for i in range(start, end):
+            self.send(data[i], rs_mode)
+
+    def wait_us(self, us):
+        """Record that the controller needs ``us`` microseconds after the last
+        queued value. Does not block."""
+        if self._count:
+            last = (self._head + self._count - 1) % self.capacity
+            self._waits[last] = max(self._waits[last], min(us, 0xFFFF))
+        else:
+            remaining_us = self._remaining_us()
+            self._sent_ms = ticks_ms()
+            self._wait_us = max(remaining_us, min(us, 0xFFFF))
+
+    def _remaining_us(self):
+        """Microseconds the controller may still need, rounded up. A
+        ``ticks_ms`` difference of n only guarantees n - 1 ms have passed."""
+        if not self._wait_us:
+            return 0
+        elapsed_us = (ticks_diff(ticks_ms(), self._sent_ms) - 1) * 1000
+        if elapsed_us >= self._wait_us:
+            self._wait_us = 0
+            return 0
+        return self._wait_us - max(0, elapsed_us)
+
+    def _wait_ready(self):
+        """Block until the controller is ready."""
+        remaining_us = self._remaining_us()
+        if remaining_us:
+            microcontroller.delay_us(remaining_us)
+            self._wait_us = 0
+
+    def pump(self, budget_us=None):
+        """
+        Send queued values for at most about ``budget_us`` microseconds of bus
+        time, estimated from the bus frequency, or until the controller needs
+        time to execute a command. Only spins out the rest of a short wait,
+        such as the settling time after a transaction, and never sleeps
+        otherwise. At least one value is sent if the controller is ready.
+
+        :param budget_us: Time budget, or ``None`` for no limit.
+        :returns: True once the queue is empty.
+        """
+        if not self._count:
+            return True
+        budget_ns = None if budget_us is None else budget_us * 1000
+        first = True
+        while self._count:
+            remaining_us = self._remaining_us()
+            if remaining_us > _SPIN_US:
+                return False
+            if remaining_us:
+                microcontroller.delay_us(remaining_us)
+                self._wait_us = 0
+                if budget_ns is not None:
+                    budget_ns -= remaining_us * 1000
+            if budget_ns is not None and budget_ns <= 0 and not first:
+                return False
+            first = False
+
+            # A run of same-mode values with no wait between them goes out in
+            # one transaction, trimmed to the remaining budget.
+            head = self._head
+            mode = self._modes[head]
+            limit = min(self._count, self.capacity - head, _MAX_BATCH)
+            if budget_ns is not None:
+                limit = max(1, min(limit, budget_ns // self._value_ns))
+            count = 1
+            while (count < limit and self._waits[head + count - 1] == 0
+                   and self._modes[head + count] == mode):
+                count += 1
+            sent = self.interface.write_values(self._values, mode, head, head + count)
+
+            last = head + sent - 1
+            self._sent_ms = ticks_ms()
+            self._wait_us = max(_SETTLE_US, self._waits[last])
+            self._head = (head + sent) % self.capacity
+            self._count -= sent
+            if budget_ns is not None:
+                budget_ns -= sent * self._value_ns
+        return True
+
+    def read_value(self, rs_mode):
+        """Flush the queue, wait for the controller, then read one byte
+        through the wrapped interface. Blocks."""
+        self.flush()
+        self._wait_ready()
+        return self.interface.read_value(rs_mode)
+
+    def flush(self):
+        """Send everything queued, blocking until done."""
+        while not self.pump():
+            self._wait_ready()
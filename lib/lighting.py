@@ -0,0 +1,117 @@
+"""Per-key RGB lighting, computed into a preallocated frame and shown only on change."""
+
+from array import array
+
+from micropython import const
+
+from scheduler import ticks_ms, ticks_add, ticks_diff
+
+_WHITE = const(0xFFFFFF)
+
+
+def _blend(color, other, weight):
+    """Mix ``other`` into ``color``; ``weight`` runs from 0 (all ``color``)
+    to 256 (all ``other``)."""
+    keep = 256 - weight
+    return ((((color >> 16) * keep + (other >> 16) * weight) >> 8) << 16
+            | ((((color >> 8) & 0xFF) * keep + ((other >> 8) & 0xFF) * weight) >> 8) << 8
+            | ((color & 0xFF) * keep + (other & 0xFF) * weight) >> 8)
+
+
+class Lighting:
+
+    def __init__(self, pixels, num_keys, strip_length=0, flash_ms=150,
+                 strip_color=0x00FF20, clock=ticks_ms):
+        """
+        Effects engine for a NeoPixel chain with one pixel per key followed
+        by a volume strip.
+
+        Keys show the mode color, and a pressed key flashes white and fades
+        back over ``flash_ms``. The strip shows the volume level. `update`
+        computes the frame, writes only the pixels that changed and calls
+        ``show()`` only if any did. It does nothing at all while nothing
+        animates. Its call rate, e.g. a scheduler task, caps the frame rate.
+
+        :param pixels: The ``neopixel.NeoPixel``, created with
+            ``auto_write=False``.
+        :param num_keys: Pixels at the start of the chain, one per key number.
+        :param strip_length: Pixels after the keys that show the volume.
+        :param flash_ms: How long a key press flash takes to fade. Default: 150.
+        :param strip_color: Color of the lit part of the strip.
+        :param clock: Function returning the current time in ``ticks_ms``.
+        """
+        self.pixels = pixels
+        self.num_keys = num_keys
+        self.strip_length = strip_length
+        self.flash_ms = flash_ms
+        self.strip_color = strip_color
+        self.clock = clock
+        self.mode_color = 0
+        self.volume = 0
+        self.shows = 0
+        count = num_keys + strip_length
+        # Colors as 0xRRGGBB: the frame being computed and what the pixels show
+        self._frame = array('L', [0] * count)
+        self._shown = array('L', [0] * count)
+        # Time each key's flash ends, or 0. A flash that happens to end at
+        # tick 0 is skipped.
+        self._flash_end_ms = array('L', [0] * num_keys)
+        self._flashing = False
+        self._dirty = True
+
+    def set_mode_color(self, color):
+        if color != self.mode_color:
+            self.mode_color = color
+            self._dirty = True
+
+    def set_volume(self, percent):
+        """Show ``percent`` (0-100) on the volume strip."""
+        percent = min(100, max(0, percent))
+        if percent != self.volume:
+            self.volume = percent
+            self._dirty = True
+
+    def flash(self, key_number, now_ms=None):
+        if now_ms is None:
+            now_ms = self.clock()
+        self._flash_end_ms[key_number] = ticks_add(now_ms, self.flash_ms)
+        self._flashing = True
+
+    def update(self, now_ms=None):
+        """Compute the frame for now and show it if it changed. Returns True
+        if ``show()`` was called."""
+        if not (self._dirty or self._flashing):
+            return False
+        if now_ms is None:
+            now_ms = self.clock()
+        frame = self._frame
+        base = self.mode_color
+        flashing = False
+        for key in range(self.num_keys):
+            color = base
+            end_ms = self._flash_end_ms[key]
+            if end_ms:
+                remaining = ticks_diff(end_ms, now_ms)
+                if remaining > 0:
+                    color = _blend(base, _WHITE, remaining * 256 // self.flash_ms)
+                    flashing = True
+                else:
+                    self._flash_end_ms[key] = 0
+            frame[key] = color
+        lit = (self.volume * self.strip_length + 50) // 100
+        for i in range(self.strip_length):
+            frame[self.num_keys + i] = self.strip_color if i < lit else 0
+        self._flashing = flashing
+        self._dirty = False
+
+        shown = self._shown
+        changed = False
+        for i in range(len(frame)):
+            if frame[i] != shown[i]:
+                shown[i] = frame[i]
+                self.pixels[i] = frame[i]
+                changed = True
+        if changed:
+            self.pixels.show()
+            self.shows += 1
+        return changed
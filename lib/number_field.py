@@ -0,0 +1,63 @@
+"""A display line of a fixed label and an integer, updated in place.
+
+``"Encoder: {}".format(position)`` builds a new string every frame. A
+`NumberField` keeps the line in one ``bytearray`` and rewrites only its
+digits, so a frame allocates nothing. The digits, '-' and the blank are
+written as ASCII codes, which every display backend's encoding shares.
+"""
+
+from micropython import const
+
+_BLANK = const(0x20)
+_MINUS = const(0x2D)
+_ZERO = const(0x30)
+_OVERFLOW = const(0x23)  # '#'
+
+
+class NumberField:
+
+    def __init__(self, label, width):
+        """
+        :param label: The encoded label in front of the number, e.g. from
+            a display backend's ``encode``.
+        :param width: Cells for the number, counting a minus sign. Values
+            that do not fit are shown as '#' in every cell.
+        """
+        self.line = bytearray(len(label) + width)
+        self.line[:len(label)] = label
+        self._start = len(label)
+        self._width = width
+        self.value = None
+        self.set(0)
+
+    def set(self, value):
+        """Show ``value``, left-aligned after the label. Returns `line`."""
+        if value == self.value:
+            return self.line
+        self.value = value
+        line = self.line
+        magnitude = -value if value < 0 else value
+        length = 1
+        rest = magnitude
+        while rest >= 10:
+            rest //= 10
+            length += 1
+        if value < 0:
+            length += 1
+        end = self._start + self._width
+        if length > self._width:
+            for i in range(self._start, end):
+                line[i] = _OVERFLOW
+            return line
+        for i in range(self._start + length, end):
+            line[i] = _BLANK
+        i = self._start + length - 1
+        while True:
+            line[i] = _ZERO + magnitude % 10
+            magnitude //= 10
+            i -= 1
+            if not magnitude:
+                break
+        if value < 0:
+            line[self._start] = _MINUS
+        return line
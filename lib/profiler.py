@@ -0,0 +1,114 @@
+"""Per-stage timing histograms, to see where the firmware's time goes.
+
+`Profiler.wrap` returns a timed stand-in for a stage's function. Each call is
+timed with ``time.monotonic_ns`` and counted in a preallocated histogram of
+power-of-two microsecond buckets, so recording a run costs no memory. The
+heap bytes each call allocated are counted too, from ``gc.mem_alloc``
+before and after: main.py turns automatic collection off, so nothing is
+freed in between and the difference is what the stage allocated.
+"""
+
+import gc
+import sys
+import time
+from array import array
+
+import supervisor
+from micropython import const
+
+# Bucket i counts runs shorter than 2**i us; the last one also counts longer runs
+BUCKETS = const(16)
+
+
+class Stage:
+    """Run count, total, maximum and histogram of one stage's durations, and
+    the most heap bytes one run allocated."""
+
+    def __init__(self, name):
+        self.name = name
+        self.histogram = array('L', [0] * BUCKETS)
+        self.reset()
+
+    def reset(self):
+        self.runs = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.max_allocated = 0
+        for i in range(BUCKETS):
+            self.histogram[i] = 0
+
+    def add(self, duration_us, allocated=0):
+        self.runs += 1
+        if allocated > self.max_allocated:
+            self.max_allocated = allocated
+        self.total_us += duration_us
+        if duration_us > self.max_us:
+            self.max_us = duration_us
+        bucket = 0
+        limit = 1
+        while duration_us >= limit and bucket < BUCKETS - 1:
+            bucket += 1
+            limit <<= 1
+        self.histogram[bucket] += 1
+
+
+class Profiler:
+
+    def __init__(self, clock_ns=time.monotonic_ns, mem_alloc=gc.mem_alloc):
+        """
+        Collects a `Stage` for each wrapped function.
+
+        :param clock_ns: Function returning the current time in nanoseconds.
+        :param mem_alloc: Function returning the heap bytes in use.
+        """
+        self.clock_ns = clock_ns
+        self.mem_alloc = mem_alloc
+        self.stages = []
+
+    def wrap(self, callback, name=None):
+        """Return a function that calls ``callback`` and records how long it
+        took and how much it allocated under ``name`` (default: the
+        function's name). A run that collected garbage counts as allocating
+        nothing."""
+        stage = Stage(name or callback.__name__)
+        self.stages.append(stage)
+        clock_ns = self.clock_ns
+        mem_alloc = self.mem_alloc
+
+        def timed(*args):
+            start = clock_ns()
+            # Read inside the clock readings, which allocate long ints
+            before = mem_alloc()
+            try:
+                return callback(*args)
+            finally:
+                allocated = mem_alloc() - before
+                stage.add((clock_ns() - start) // 1000, allocated)
+
+        return timed
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def dump(self):
+        """Print a line per stage: runs, mean and maximum in microseconds,
+        the most bytes a run allocated, then the run count of each
+        histogram bucket."""
+        print("{:<14} {:>7} {:>8} {:>8} {:>7}  runs under 1, 2, 4 ... {} us".format(
+            "stage", "runs", "mean us", "max us", "max B", 1 << (BUCKETS - 1)))
+        for stage in self.stages:
+            print("{:<14} {:>7} {:>8} {:>8} {:>7}  {}".format(
+                stage.name, stage.runs, stage.total_us // stage.runs if stage.runs else 0,
+                stage.max_us, stage.max_allocated,
+                " ".join(str(count) for count in stage.histogram)))
+
+    def poll_console(self):
+        """Handle commands typed on the serial console: "p" dumps the
+        histograms and "r" clears them. Never waits for input."""
+        while supervisor.runtime.serial_bytes_available:
+            command = sys.stdin.read(1)
+            if command == "p":
+                self.dump()
+            elif command == "r":
+                self.reset()
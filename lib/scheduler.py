@@ -0,0 +1,235 @@
+"""Cooperative task scheduler on a timer wheel.
+
+Each stage of the firmware registers a callback with its own cadence, and
+one-shot timers (debounce, delays) are started and cancelled at will. All of
+them are `Timer` objects in one `TimerWheel` keyed on ``supervisor.ticks_ms``.
+On the board `Scheduler.run` advances the wheel in a plain loop, so no
+event loop library is needed in lib/; the host simulator steps it
+deterministically with `Scheduler.run_due` instead.
+"""
+
+import supervisor
+from micropython import const
+
+# supervisor.ticks_ms counts milliseconds modulo 2**29 and, on the board,
+# wraps about a minute after boot. It stays a small int, so reading it
+# allocates nothing, unlike time.monotonic_ns().
+_TICKS_PERIOD = const(1 << 29)
+_TICKS_MAX = const(_TICKS_PERIOD - 1)
+_TICKS_HALF = const(_TICKS_PERIOD // 2)
+
+ticks_ms = supervisor.ticks_ms
+
+# Priority of timers that are not tasks: after every task
+_LAST = const(0x3FFFFFFF)
+
+
+def ticks_add(ticks, delta):
+    """``ticks`` moved by ``delta`` milliseconds, wrapped like ``ticks_ms``."""
+    return (ticks + delta) & _TICKS_MAX
+
+
+def ticks_diff(end, start):
+    """Signed milliseconds from ``start`` to ``end``, two ``ticks_ms`` values
+    less than 2**28 ms apart, across a wraparound too."""
+    return ((end - start + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+class Timer:
+    """A callback that a `TimerWheel` runs once, or every ``interval_ms``
+    milliseconds when ``periodic``."""
+
+    def __init__(self, name, callback, interval_ms=0, periodic=False):
+        self.name = name
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.periodic = periodic
+        # Timers due on the same tick run in ascending priority
+        self.priority = _LAST
+        self.deadline_ms = 0
+        self.active = False
+        # Links in the wheel slot's list
+        self._slot = 0
+        self._prev = None
+        self._next = None
+
+    def run(self):
+        """Run the callback once. Errors are reported and do not stop the timer."""
+        try:
+            self.callback()
+        except Exception as e:
+            print("An error in the {} timer occurred: {}".format(self.name, e))
+
+
+class Task(Timer):
+    """A periodic stage registered with a `Scheduler`."""
+
+    def __init__(self, name, interval_ms, callback):
+        super().__init__(name, callback, interval_ms, periodic=True)
+
+    def run(self):
+        """Run the callback once. Errors are reported and do not stop the task."""
+        try:
+            self.callback()
+        except Exception as e:
+            print("An error in the {} task occurred: {}".format(self.name, e))
+
+
+class TimerWheel:
+
+    def __init__(self, slots=64, clock=ticks_ms):
+        """
+        Hashed timer wheel with one slot per millisecond.
+
+        A timer is linked into the slot of its deadline modulo ``slots``, so
+        starting and cancelling one is O(1) and allocates nothing. `advance`
+        visits only the slots of the ticks that have passed, and fires the
+        timers there whose deadline has been reached; timers further out
+        than one turn of the wheel stay in their slot until then. Deadlines
+        are ``ticks_ms`` values, so wraparound is handled by `ticks_diff`.
+
+        :param slots: Number of slots, a power of two. Default: 64.
+        :param clock: Function returning the current time in ``ticks_ms``.
+        """
+        self.clock = clock
+        self._mask = slots - 1
+        self._heads = [None] * slots
+        self._tails = [None] * slots
+        # The first tick `advance` has not visited yet
+        self._next_ms = clock()
+        # Counts inserts and cancels, to notice callbacks that change a slot
+        self._changes = 0
+
+    def start(self, timer, delay_ms):
+        """(Re)start ``timer`` to fire ``delay_ms`` milliseconds from now."""
+        if timer.active:
+            self.cancel(timer)
+        timer.deadline_ms = ticks_add(self.clock(), delay_ms)
+        self._insert(timer)
+
+    def cancel(self, timer):
+        """Stop ``timer`` if it is running."""
+        if not timer.active:
+            return
+        slot = timer._slot
+        if timer._prev is None:
+            self._heads[slot] = timer._next
+        else:
+            timer._prev._next = timer._next
+        if timer._next is None:
+            self._tails[slot] = timer._prev
+        else:
+            timer._next._prev = timer._prev
+        timer._prev = None
+        timer._next = None
+        timer.active = False
+        self._changes += 1
+
+    def _insert(self, timer):
+        # A deadline on a tick already visited goes in the next slot to visit
+        tick = timer.deadline_ms
+        if ticks_diff(tick, self._next_ms) < 0:
+            tick = self._next_ms
+        slot = tick & self._mask
+        # Append, but keep timers of a higher priority ahead
+        after = self._tails[slot]
+        while after is not None and after.priority > timer.priority:
+            after = after._prev
+        before = self._heads[slot] if after is None else after._next
+        timer._prev = after
+        timer._next = before
+        if after is None:
+            self._heads[slot] = timer
+        else:
+            after._next = timer
+        if before is None:
+            self._tails[slot] = timer
+        else:
+            before._prev = timer
+        timer._slot = slot
+        timer.active = True
+        self._changes += 1
+
+    def advance(self, now_ms=None):
+        """Fire every timer whose deadline is at or before ``now_ms``
+        (default: now). Periodic timers are started again for their next
+        slot first, keeping a fixed cadence but skipping missed slots rather
+        than bunching up."""
+        if now_ms is None:
+            now_ms = self.clock()
+        ticks = ticks_diff(now_ms, self._next_ms) + 1
+        if ticks <= 0:
+            return
+        # After a gap of a full turn or more, every slot is visited once
+        first = self._next_ms
+        for i in range(min(ticks, self._mask + 1)):
+            slot = (first + i) & self._mask
+            # Timers started from a callback go in a later slot
+            self._next_ms = ticks_add(first, i + 1)
+            timer = self._heads[slot]
+            while timer is not None:
+                following = timer._next
+                if not ticks_diff(now_ms, timer.deadline_ms) >= 0:
+                    timer = following
+                    continue
+                self.cancel(timer)
+                if timer.periodic:
+                    timer.deadline_ms = ticks_add(timer.deadline_ms, timer.interval_ms)
+                    if ticks_diff(timer.deadline_ms, now_ms) <= 0:
+                        timer.deadline_ms = ticks_add(now_ms, max(1, timer.interval_ms))
+                    self._insert(timer)
+                changes = self._changes
+                timer.run()
+                # If the callback started or cancelled timers, the slot may
+                # have changed under us: walk it again from the start. Fired
+                # timers are no longer due, so nothing runs twice.
+                timer = following if self._changes == changes else self._heads[slot]
+        self._next_ms = ticks_add(now_ms, 1)
+
+
+class Scheduler:
+
+    def __init__(self, clock=ticks_ms, slots=64):
+        """
+        Runs periodic tasks and one-shot timers cooperatively.
+
+        :param clock: Function returning the current time in ``ticks_ms``.
+        :param slots: Slots in the `TimerWheel`. Default: 64.
+        """
+        self.clock = clock
+        self.wheel = TimerWheel(slots, clock)
+        self.tasks = []
+
+    def every(self, interval_ms, callback, name=None):
+        """Run ``callback`` every ``interval_ms`` milliseconds, starting now. An
+        interval of 0 runs it on every tick. Tasks due on the same tick run
+        in registration order. Returns the new `Task`."""
+        task = Task(name or callback.__name__, interval_ms, callback)
+        task.priority = len(self.tasks)
+        self.tasks.append(task)
+        self.wheel.start(task, 0)
+        return task
+
+    def timer(self, callback, name=None):
+        """A one-shot `Timer` for ``callback``, not started yet. Start it
+        with `start`; it runs after the tasks due on the same tick."""
+        return Timer(name or callback.__name__, callback)
+
+    def start(self, timer, delay_ms):
+        """(Re)start ``timer`` to run once, ``delay_ms`` milliseconds from now."""
+        self.wheel.start(timer, delay_ms)
+
+    def cancel(self, timer):
+        self.wheel.cancel(timer)
+
+    def run_due(self, now_ms=None):
+        """Run every task and timer that is due. Used to step the scheduler
+        without an event loop."""
+        self.wheel.advance(now_ms)
+
+    def run(self):
+        """Run all tasks forever. Between ticks `TimerWheel.advance` returns
+        straight away, so the loop polls ``ticks_ms`` until the next one."""
+        advance = self.wheel.advance
+        while True:
+            advance()
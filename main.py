@@ -1,26 +1,66 @@
 import board
+import gc
 import keypad
-import time
-from adafruit_hid.keyboard import Keyboard
-from adafruit_hid.keycode import Keycode
 from adafruit_hid.consumer_control import ConsumerControl
 from adafruit_hid.consumer_control_code import ConsumerControlCode
 import usb_hid
 import rotaryio
-import digitalio
 import busio
-import lcd
-import i2c_pcf8574_interface
+import neopixel
 import random #for "dnd dice, new mode"
+from micropython import const
+from keymap import Keymap, ReportKeyboard
+from scheduler import Scheduler, ticks_ms, ticks_diff
+from consumer_queue import ConsumerStepQueue
+from encoder_accel import AcceleratedEncoder
+from displays import HD44780Display, SSD1306Display
+from font_cache import BuiltinFont, GlyphCache
+from lighting import Lighting
+from event_log import EventLog, DEBUG
+from number_field import NumberField
+import keymaps
+
+# Compile every mode's bindings once at boot
+keymap = Keymap(keymaps.MODES, keymaps.NUM_KEYS)
+
+# Console log. Events are written to a ring buffer without formatting and
+# printed by the log task once input has been quiet for a moment, so a slow
+# or missing serial console never holds up a key press. Set LOGGING to
+# False to compile every log call out.
+LOGGING = const(True)
+LOG_LEVEL = DEBUG
+LOG_KEY_PRESS = const(0)
+LOG_KEY_RELEASE = const(1)
+LOG_TYPING = const(2)
+LOG_MODE = const(3)
+LOG_VOLUME = const(4)
+LOG_OVERFLOW = const(5)
+LOG_PLAY_PAUSE = const(6)
+# Format string for each event code above
+LOG_EVENTS = (
+    "Key pressed: {}",
+    "Key released: {}",
+    "Typing key {} of mode {}",
+    "Switched to mode {}",
+    "Volume {:+d}",
+    "Key event queue overflowed {} times",
+    "Play/pause",
+)
+log = EventLog(LOG_EVENTS, level=LOG_LEVEL)
+
+# Stage profiling. With PROFILING set to True, type "p" on the serial
+# console for each stage's timing histogram and the most bytes one run
+# allocated, and "r" to clear them. Set to False, the stages are not
+# wrapped at all.
+PROFILING = const(False)
 
-# Define modes
+# First mode in keymaps.MODES
 MODE_BLENDER = 0
-MODE_KRITA = 1
 
 # Initialize current mode
 current_mode = MODE_BLENDER
 
-kbd = Keyboard(usb_hid.devices)
+kbd = ReportKeyboard(usb_hid.devices)
 cc = ConsumerControl(usb_hid.devices) 
 
 # create KeyMatrix to read key presses
@@ -29,364 +69,287 @@ matrix = keypad.KeyMatrix(
     column_pins=(board.GP4, board.GP5, board.GP6, board.GP7, board.GP8, board.GP9 )
 )
 
-# Set up I2C for LCD
+# Set up I2C for the display
 i2c = busio.I2C(scl=board.GP1, sda=board.GP0)
-address = 0x27
-i2c = i2c_pcf8574_interface.I2CPCF8574Interface(i2c, address)
 
-# Set up LCD display
-display = lcd.LCD(i2c, num_rows=2, num_cols=16)
-display.set_backlight(True)
-display.set_display_enabled(True)
-display.clear()
-display.print("NAT 20")
+# Display fitted: "hd44780" for the 16x2 LCD at 0x27, "ssd1306" for a
+# 128x64 OLED at 0x3C. Both draw the same frames. Display traffic is
+# queued and sent by the display pump task, so it never blocks key handling.
+DISPLAY_BACKEND = "hd44780"
+# BDF/PCF font file for the OLED, or None for the built-in 5x7 font
+OLED_FONT = None
+# Every character a frame can show. Only these glyphs are loaded.
+DISPLAY_TEXT = "NAT 20" + "Mode: " + "".join(keymap.names) + "Encoder: -0123456789"
+if DISPLAY_BACKEND == "ssd1306":
+    mem_free = gc.mem_free()
+    if OLED_FONT is None:
+        font = BuiltinFont()
+    else:
+        from adafruit_bitmap_font import bitmap_font
+        font = bitmap_font.load_font(OLED_FONT)
+    font = GlyphCache(font, DISPLAY_TEXT)
+    # Drops the font file's own glyph bitmaps
+    gc.collect()
+    print("Font cache: {} glyphs, {} bytes packed, {} bytes of RAM".format(
+        len(font), font.size, mem_free - gc.mem_free()))
+    display = SSD1306Display(i2c, address=0x3C, font=font)
+else:
+    # After a soft reload the controller is still initialized, so warm
+    # start skips the reset sequence.
+    display = HD44780Display(i2c, address=0x27, num_rows=2, num_cols=16, warm_start=True)
+
+# Per-key lighting: one NeoPixel per key number, then the volume strip
+VOLUME_PIXELS = 8
+pixels = neopixel.NeoPixel(board.GP16, keymaps.NUM_KEYS + VOLUME_PIXELS,
+                           brightness=0.3, auto_write=False)
+lighting = Lighting(pixels, keymaps.NUM_KEYS, strip_length=VOLUME_PIXELS)
+# Key color for each mode, in mode order
+MODE_COLORS = (0xF5792A, 0x4B8BD6)
+lighting.set_mode_color(MODE_COLORS[current_mode])
+
+# Mode lines are encoded once; rendering an unchanged one costs nothing
+MODE_LABELS = tuple(display.encode("Mode: " + name) for name in keymap.names)
+display.render(("NAT 20",))
+# The encoder line is one buffer whose digits are rewritten in place, and
+# every frame reuses one list, so drawing a frame allocates nothing
+ENCODER_LABEL = display.encode("Encoder: ")
+encoder_field = NumberField(ENCODER_LABEL, display.num_cols - len(ENCODER_LABEL))
+frame = [MODE_LABELS[current_mode], encoder_field.line]
 
 # Initialize rotary encoder
 encoder = rotaryio.IncrementalEncoder(board.GP17, board.GP18)
-switch = digitalio.DigitalInOut(board.GP19)
-switch.direction = digitalio.Direction.INPUT
-switch.pull = digitalio.Pull.UP
 
 # Initialize rotary encoder for mode selection
 encoder_mode = rotaryio.IncrementalEncoder(board.GP22, board.GP21)
-switch_mode = digitalio.DigitalInOut(board.GP20)
-switch_mode.direction = digitalio.Direction.INPUT
-switch_mode.pull = digitalio.Pull.UP
-
-# Adjustable thresholds for volume control
-VOLUME_STATE = 0
-VOLUME_THRESHOLD = 2  # Adjust as needed
 
-# Debounce delay in seconds
-DEBOUNCE_DELAY_KEYPAD = 0.1  # Adjust as needed
-DEBOUNCE_DELAY_ENCODER = 0.1    # Adjust as needed
+# The encoders' push switches are scanned and debounced in the background
+# like the key matrix, and queue one timestamped event per press and release
+encoder_switches = keypad.Keys((board.GP19, board.GP20), value_when_pressed=False, pull=True)
+SWITCH_PLAY_PAUSE = 0  # Volume encoder: play/pause
+SWITCH_MODE = 1  # Mode encoder: next mode
+
+# Volume encoder with acceleration: slow turns step the volume once per
+# detent, fast spins up to 8 times per detent. Each point is (detents per
+# second, sixteenths of a step per detent).
+VOLUME_ACCELERATION = ((0, 16), (10, 16), (30, 48), (80, 128))
+volume_encoder = AcceleratedEncoder(encoder, VOLUME_ACCELERATION)
+VOLUME_REPORT_INTERVAL_MS = 20  # Minimum time between volume reports to the host
+# The host's volume is not known: the strip shows an estimate from the
+# steps sent, at the host's usual 2% per step.
+VOLUME_STEP_PERCENT = 2
+volume_level = 50
+
+# Volume steps waiting to be sent
+volume_queue = ConsumerStepQueue(
+    cc,
+    ConsumerControlCode.VOLUME_INCREMENT,
+    ConsumerControlCode.VOLUME_DECREMENT,
+    interval_ms=VOLUME_REPORT_INTERVAL_MS,
+    # A full sweep of the volume; a fast spin does not keep it moving for long
+    max_pending=100 // VOLUME_STEP_PERCENT,
+)
 
-# Initialize last switch state for debounce
-switch_last_state = switch.value
-switch_last_time = time.monotonic()
+# Task cadences in milliseconds
+INPUT_INTERVAL_MS = 1
+ENCODER_INTERVAL_MS = 10
+DISPLAY_INTERVAL_MS = 100
+DISPLAY_PUMP_INTERVAL_MS = 1
+DISPLAY_PUMP_BUDGET_US = 500  # Bus time the display may use per pump task run
+MARQUEE_STEP_MS = 300  # One display shift per step
+LIGHTING_INTERVAL_MS = 20  # Caps the lighting at 50 frames a second
+TELEMETRY_INTERVAL_MS = 1000
+LOG_INTERVAL_MS = 50
+LOG_FLUSH_RECORDS = 8  # Most records printed per log task run
+PROFILER_CONSOLE_INTERVAL_MS = 200
+GC_INTERVAL_MS = 100
+
+# Automatic garbage collection is off while running, so a collection never
+# lands in the middle of typing. The gc task collects once no key event has
+# come in for GC_IDLE_MS, or straight away if free memory runs low.
+GC_IDLE_MS = 250
+GC_RESERVE_BYTES = 32 * 1024
 
 def roll_dice(sides):
     """Simulate rolling a dice with a given number of sides."""
     return random.radint(1, sides)
 
+# Reused for every event drained from the key matrix and switch queues
+key_event = keypad.Event()
+switch_event = keypad.Event()
+
+# Number of times the key matrix event queue filled up and dropped events
+key_events_overflowed = 0
+
+# Time of the last key event, in ticks_ms
+last_input_ms = ticks_ms()
+
 def keypad_input():
+    global key_events_overflowed
+    global last_input_ms
     try:
-        event = matrix.events.get()
-        if event:
-            key_number = event.key_number
-            if event.pressed:
-                print(f'Key pressed: {key_number}')
+        # Drain every queued event. The queue is FIFO, so events are applied
+        # in timestamp order.
+        while matrix.events.get_into(key_event):
+            key_number = key_event.key_number
+            last_input_ms = key_event.timestamp
+            if key_event.pressed:
                 # Perform action based on key number
                 handle_key_press(key_number)
+                if LOGGING:
+                    log.debug(LOG_KEY_PRESS, key_number)
             else:
-                print(f'Key released: {key_number}')
                 # Additional logic for key releases can be added here if needed
                 kbd.release_all()
-                
+                if LOGGING:
+                    log.debug(LOG_KEY_RELEASE, key_number)
+
+        if matrix.events.overflowed:
+            # Some transitions were lost: drop the stale key state and have
+            # the matrix report every key that is still held.
+            key_events_overflowed += 1
+            matrix.events.clear()
+            kbd.release_all()
+            matrix.reset()
+
     except Exception as e:
         print("An error in keypad_input occurred: {}".format(e))
         
-def volume_control(position):
-    global VOLUME_STATE
-    global VOLUME_THRESHOLD
-
-    # Check for a change in position
-    delta = position - VOLUME_STATE
-
-    if abs(delta) >= VOLUME_THRESHOLD:
-        # Determine the direction of the change
-        if delta > 0:
-            # Volume up
-            VOLUME_STATE = position
-            print("Volume Up")
-            for _ in range(abs(delta)):
-                cc.send(ConsumerControlCode.VOLUME_INCREMENT)
-                time.sleep(0.1)  # Add a small delay between increments
-            # Additional logic for volume up can be added here if needed
-        elif delta < 0:
-            # Volume down
-            VOLUME_STATE = position
-            print("Volume Down")
-            for _ in range(abs(delta)):
-                cc.send(ConsumerControlCode.VOLUME_DECREMENT)
-                time.sleep(0.1)  # Add a small delay between decrements
-            # Additional logic for volume down can be added here if needed
-
-def play_pause():
-    global switch_last_state
-    global switch_last_time
-
-    switch_state = switch.value
-
-    # Check for a change in switch state
-    if switch_state != switch_last_state:
-        # Record the time when the switch changes state
-        switch_last_time = time.monotonic()
-
-    # If the switch state has been stable for a while, register the press
-    if time.monotonic() - switch_last_time > DEBOUNCE_DELAY_ENCODER:
-        if not switch_state:  # Check if the switch is pressed
+def volume_control():
+    global volume_level
+
+    steps = volume_encoder.steps()
+    if steps:
+        # Queue the steps; the volume task sends them without blocking input.
+        # Only the steps the queue kept will reach the host.
+        accepted = volume_queue.add(steps)
+        volume_level = min(100, max(0, volume_level + accepted * VOLUME_STEP_PERCENT))
+        lighting.set_volume(volume_level)
+        if LOGGING:
+            log.debug(LOG_VOLUME, steps)
+
+def switch_input():
+    # One event per press, however long the switch is held
+    while encoder_switches.events.get_into(switch_event):
+        if not switch_event.pressed:
+            continue
+        if switch_event.key_number == SWITCH_PLAY_PAUSE:
             # Toggle play/pause state
             cc.send(ConsumerControlCode.PLAY_PAUSE)
-            time.sleep(0.1)
+            if LOGGING:
+                log.info(LOG_PLAY_PAUSE)
+        else:
+            set_mode(current_mode + 1)
 
-    # Update the last switch state
-    switch_last_state = switch_state
-    
 def handle_key_press(key_number):
-    global current_mode
-    
-    # Define actions for each key number
-    # Action for key 0: Type 'A'
-    if current_mode == MODE_BLENDER:
-        if key_number == 0:
-            print("Typing 'tab'")
-            kbd.press(Keycode.TAB)
-        elif key_number == 1:
-            # Action for key 1: Type 'B'
-            print("Typing 'B'")
-            kbd.press(Keycode.B)
-        elif key_number == 2:
-            # Action for key 2: Type 'C'
-            print("Typing 'G'")
-            kbd.press(Keycode.G)
-        elif key_number == 3:
-            # Action for key 3: Type 'D'
-            print("Typing 'R'")
-            kbd.press(Keycode.R)
-        elif key_number == 4:
-            # Action for key 4: Type 'E'
-            print("Typing 'S'")
-            kbd.press(Keycode.S)
-        elif key_number == 5:
-            # Action for key 6: Type 'G'
-            print("Typing 'O'")
-            kbd.press(Keycode.O)
-        elif key_number == 6:
-            # Action for key 6: Type 'G'
-            print("Typing 'E'")
-            kbd.press(Keycode.E)
-        elif key_number == 7:
-            # Action for key 6: Type 'G'
-            print("Typing 'I'")
-            kbd.press(Keycode.I)
-        elif key_number == 8:
-            # Action for key 6: Type 'G'
-            print("Typing 'X'")
-            kbd.press(Keycode.X)
-        elif key_number == 9:
-            # Action for key 6: Type 'G'
-            print("Typing 'Y'")
-            kbd.press(Keycode.Y)
-        elif key_number == 10:
-            # Action for key 6: Type 'G'
-            print("Typing 'Z'")
-            kbd.press(Keycode.Z)
-        elif key_number == 11:
-            # Action for key 6: Type 'G'
-            print("Typing 'undo'")
-            kbd.press(Keycode.CONTROL, Keycode.Z)
-        elif key_number == 12:
-            # Action for key 6: Type 'G'
-            print("Typing 'ZERO'")
-            kbd.press(Keycode.KEYPAD_ZERO)
-        elif key_number == 13:
-            # Action for key 6: Type 'G'
-            print("Typing 'NUM .'")
-            kbd.press(Keycode.KEYPAD_PERIOD)
-        elif key_number == 14:
-            # Action for key 6: Type 'G'
-            print("1'")
-            kbd.press(Keycode.ONE)
-        elif key_number == 15:
-            # Action for key 6: Type 'G'
-            print("Typing '2'")
-            kbd.press(Keycode.TWO)
-        elif key_number == 16:
-            # Action for key 6: Type 'G'
-            print("Typing '3'")
-            kbd.press(Keycode.THREE)
-        elif key_number == 17:
-            # Action for key 6: Type 'G'
-            print("Typing 'CRTL + Z'")
-            kbd.press(Keycode.CONTROL, Keycode.ALT, Keycode.Z)
-        elif key_number == 18:
-            # Action for key 6: Type 'G'
-            print("Typing 'shift'")
-            kbd.press(Keycode.SHIFT)
-        elif key_number == 19:
-            # Action for key 6: Type 'G'
-            print("Typing 'SHIFT +ALT'")
-            kbd.press(Keycode.SHIFT, Keycode.ALT)
-        elif key_number == 20:
-            # Action for key 6: Type 'G'
-            print("Typing 'A'")
-            kbd.press(Keycode.A)
-        elif key_number == 21:
-            # Action for key 6: Type 'G'
-            print("Typing 'SHIFT + A'")
-            kbd.press(Keycode.SHIFT, Keycode.A)
-        elif key_number == 22:
-            # Action for key 6: Type 'G'
-            print("Typing 'loop cut'")
-            kbd.press(Keycode.CONTROL, Keycode.R)
-        elif key_number == 23:
-            # Action for key 6: Type 'G'
-            print("Typing 'CRTL + SAVE'")
-            kbd.press(Keycode.CONTROL, Keycode.S)
-
-    elif current_mode == MODE_KRITA:
-        # Handle key presses in CAPSLOCK mode
-        if key_number == 0:
-            print("Typing 'tab'")
-            kbd.press(Keycode.TAB)
-        elif key_number == 1:
-            # Action for key 1: Type 'B'
-            print("Typing 'B'")
-            kbd.press(Keycode.B)
-        elif key_number == 2:
-            # Action for key 2: Type 'C'
-            print("Typing 'G'")
-            kbd.press(Keycode.CONTROL, Keycode.T)
-        elif key_number == 3:
-            # Action for key 3: Type 'D'
-            print("Typing 'R'")
-            kbd.press(Keycode.CONTROL, Keycode.A)
-        elif key_number == 4:
-            # Action for key 4: Type 'E'
-            print("Typing 'S'")
-            kbd.press(Keycode.CONTROL, Keycode.J)
-        elif key_number == 5:
-            # Action for key 6: Type 'G'
-            print("Typing 'O'")
-            kbd.press(Keycode.CONTROL, Keycode.SHIFT, Keycode.N)
-        elif key_number == 6:
-            # Action for key 6: Type 'G'
-            print("Typing 'E'")
-            kbd.press(Keycode.CONTROL)
-        elif key_number == 7:
-            # Action for key 6: Type 'G'
-            print("Typing '1'")
-            kbd.press(Keycode.N)
-        elif key_number == 8:
-            # Action for key 6: Type 'G'
-            print("Typing '2'")
-            kbd.press(Keycode.M)
-        elif key_number == 9:
-            # Action for key 6: Type 'G'
-            print("Typing '3'")
-            kbd.press(Keycode.K)
-        elif key_number == 10:
-            # Action for key 6: Type 'G'
-            print("Typing '4'")
-            kbd.press(Keycode.CONTROL, Keycode.D)
-        elif key_number == 11:
-            # Action for key 6: Type 'G'
-            print("Typing 'C'")
-            kbd.press(Keycode.CONTROL, Keycode.Z)
-        elif key_number == 12:
-            # Action for key 6: Type 'G'
-            print("Typing 'ESC'")
-            kbd.press(Keycode.F)
-        elif key_number == 13:
-            # Action for key 6: Type 'G'
-            print("Typing 'NUM .'")
-            kbd.press(Keycode.E)
-        elif key_number == 14:
-            # Action for key 6: Type 'G'
-            print("Q'")
-            kbd.press(Keycode.B)
-        elif key_number == 15:
-            # Action for key 6: Type 'G'
-            print("Typing 'W'")
-            kbd.press(Keycode.LEFT_BRACKET)
-        elif key_number == 16:
-            # Action for key 6: Type 'G'
-            print("Typing 'E'")
-            kbd.press(Keycode.RIGHT_BRACKET)
-        elif key_number == 17:
-            # Action for key 6: Type 'G'
-            print("Typing 'CRTL + Z'")
-            kbd.press(Keycode.CONTROL, Keycode.SHIFT, Keycode.Z)
-        elif key_number == 18:
-            # Action for key 6: Type 'G'
-            print("Typing 'SPACE'")
-            kbd.press(Keycode.SPACE)
-        elif key_number == 19:
-            # Action for key 6: Type 'G'
-            print("Typing 'A'")
-            kbd.press(Keycode.CONTROL, Keycode.SPACE)
-        elif key_number == 20:
-            # Action for key 6: Type 'G'
-            print("Typing 'S'")
-            kbd.press(Keycode.SHIFT, Keycode.SPACE)
-        elif key_number == 21:
-            # Action for key 6: Type 'G'
-            print("Typing 'D'")
-            kbd.press(Keycode.COMMA)
-        elif key_number == 22:
-            # Action for key 6: Type 'G'
-            print("Typing 'loop cut'")
-            kbd.press(Keycode.PERIOD, Keycode.R)
-        elif key_number == 23:
-            # Action for key 6: Type 'G'
-            print("Typing 'CRTL + SAVE'")
-            kbd.press(Keycode.CONTROL, Keycode.S)
-
-
-def switch_mode():
-    global current_mode
-
-    # Check if specific keys are pressed for mode switching
-    event = matrix.events.get()
-    if event and event.pressed:
-        key_number = event.key_number
-        current_mode = (current_mode + 1) % 3  # Switch between MODE_NORMAL, MODE_CAPSLOCK, and MODE_MEDIA
-        print(f"Switched to mode {current_mode}")
+    action = keymap.lookup(current_mode, key_number)
+    if action is not None:
+        action.press(kbd)
+        if LOGGING:
+            log.debug(LOG_TYPING, key_number, current_mode)
+    # After the report is sent, so lighting never holds it up
+    lighting.flash(key_number)
 
 
-def loop():
+def set_mode(mode):
     global current_mode
 
-    try:
-        # Rotation
-        volume_control(encoder.position)
-
-        # Keypad input
-        keypad_input()
-
-        # Play/Pause with encoder button
-        play_pause()
-        
-        # Mode selection with second encoder
-        mode_delta = encoder_mode.position
-        if mode_delta != 0:
-            global current_mode  # Add this line to declare current_mode as a global variable
-            # Change the direction of mode cycle
-            current_mode = (current_mode - mode_delta) % 3
-            encoder_mode.position = 0  # Reset position after mode change
-            print(f"Switched to mode {current_mode}")
-
-
-        # Display selected mode on LCD
-        display.clear()
-        if current_mode == MODE_BLENDER:
-            display.print("Mode: BLENDER")
-        elif current_mode == MODE_KRITA:
-            display.print("Mode: KRITA")
-        elif current_mode == MODE_MEDIA:
-            display.print("Mode: Media")
-        display.set_cursor_pos(1, 0)
-        display.print("Encoder: {}".format(encoder.position))
-        time.sleep(0.1)
-        
-    except Exception as e:
-        print("An error in the loop occurred: {}".format(e))
+    current_mode = mode % len(keymap)
+    lighting.set_mode_color(MODE_COLORS[current_mode % len(MODE_COLORS)])
+    if LOGGING:
+        log.info(LOG_MODE, current_mode)
+
+def mode_select():
+    # Mode selection with second encoder
+    mode_delta = encoder_mode.position
+    if mode_delta != 0:
+        # Change the direction of mode cycle
+        encoder_mode.position = 0  # Reset position after mode change
+        set_mode(current_mode - mode_delta)
+
+def encoders():
+    # Rotation
+    volume_control()
+
+    # Play/Pause and next mode with the encoder buttons
+    switch_input()
+
+    mode_select()
+
+def update_display():
+    # Skip this frame if the last one is still being sent, so the frame
+    # rate drops instead of the queue growing.
+    if not display.idle:
+        return
+
+    # Display selected mode; only changed characters are sent
+    frame[0] = MODE_LABELS[current_mode]
+    encoder_field.set(encoder.position)
+    display.render(frame)
+
+# Last overflow count printed by the telemetry task
+key_events_overflowed_reported = 0
+
+def pump_display():
+    display.pump(DISPLAY_PUMP_BUDGET_US)
+
+# Heap in use right after the last collection
+gc_baseline = 0
+
+def collect_garbage():
+    global gc_baseline
+
+    if gc.mem_free() < GC_RESERVE_BYTES or (
+            gc.mem_alloc() > gc_baseline
+            and ticks_diff(ticks_ms(), last_input_ms) >= GC_IDLE_MS):
+        gc.collect()
+        gc_baseline = gc.mem_alloc()
+
+def telemetry():
+    global key_events_overflowed_reported
+
+    if key_events_overflowed != key_events_overflowed_reported:
+        key_events_overflowed_reported = key_events_overflowed
+        if LOGGING:
+            log.warning(LOG_OVERFLOW, key_events_overflowed)
+
+if PROFILING:
+    # Only imported when profiling, so it takes no RAM otherwise
+    from profiler import Profiler
+
+    # Stages called from other stages are looked up at call time, so
+    # rebinding the names times those calls too
+    profiler = Profiler()
+    keypad_input = profiler.wrap(keypad_input)
+    volume_control = profiler.wrap(volume_control)
+    switch_input = profiler.wrap(switch_input)
+    mode_select = profiler.wrap(mode_select)
+    update_display = profiler.wrap(update_display)
+    pump_display = profiler.wrap(pump_display)
+    volume_queue.service = profiler.wrap(volume_queue.service, "volume queue")
+    lighting.update = profiler.wrap(lighting.update, "lighting")
+
+# Each stage runs as its own task, so key handling is not held up by the
+# encoders or a display redraw.
+scheduler = Scheduler()
+scheduler.every(INPUT_INTERVAL_MS, keypad_input, name="input")
+scheduler.every(ENCODER_INTERVAL_MS, encoders, name="encoder")
+scheduler.every(VOLUME_REPORT_INTERVAL_MS, volume_queue.service, name="volume")
+scheduler.every(DISPLAY_INTERVAL_MS, update_display, name="display")
+scheduler.every(DISPLAY_PUMP_INTERVAL_MS, pump_display, name="display pump")
+scheduler.every(MARQUEE_STEP_MS, display.scroll, name="marquee")
+scheduler.every(LIGHTING_INTERVAL_MS, lighting.update, name="lighting")
+scheduler.every(TELEMETRY_INTERVAL_MS, telemetry, name="telemetry")
+if LOGGING:
+    scheduler.every(LOG_INTERVAL_MS, lambda: log.flush(LOG_FLUSH_RECORDS), name="log")
+if PROFILING:
+    scheduler.every(PROFILER_CONSOLE_INTERVAL_MS, profiler.poll_console, name="profiler")
+scheduler.every(GC_INTERVAL_MS, collect_garbage, name="gc")
+
+# Start from a clean heap; from here on only the gc task collects
+gc.collect()
+gc_baseline = gc.mem_alloc()
+gc.disable()
 
 
 if __name__ == "__main__":
-    while True:
-        try:
-            loop()
-        except Exception as e:
-            print("An error in the main loop occurred: {}".format(e))
+    scheduler.run()
@@ -0,0 +1,182 @@
+"""Host-side hardware simulator for running the firmware under CPython.
+
+Typical use::
+
+    import sim
+
+    hw = sim.install()
+    main = hw.import_firmware("main")
+    hw.tap(5)
+    hw.run(main.scheduler, 50)
+    print(hw.lcd.lines(), hw.keyboard.reports)
+
+`install` registers fakes for the CircuitPython modules the firmware imports
+(``board``, ``keypad``, ``rotaryio``, ``digitalio``, ``busio``, ``usb_hid``,
+``microcontroller``, ``supervisor``, ``micropython``, ``neopixel``,
+``adafruit_bus_device`` and, for firmware modules, ``gc``) and attaches an emulated PCF8574/HD44780 LCD at
+I2C address 0x27, and optionally an SSD1306 OLED. Everything runs on one
+`VirtualClock`.
+"""
+
+import os
+import sys
+
+from .clock import VirtualClock
+from .hd44780 import PCF8574Backpack
+from .ssd1306 import SSD1306
+from . import devices
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB = os.path.join(ROOT, "lib")
+
+# Host modules the firmware imports that must keep the host's ``time``, and
+# ``gc``, which must be loaded to be swapped for the simulated one
+_HOST_MODULES = ("gc", "random", "struct")
+
+
+class Hardware:
+    """The simulated board: clock, pins, scanners, encoders, I2C and USB."""
+
+    def __init__(self, clock=None):
+        self.clock = clock or VirtualClock()
+        self.pins = {}
+        self.scanners = []
+        # (scan time in ns, key number, pressed) for every queued key event
+        self.key_events = []
+        self.encoders = {}
+        self.i2c_buses = []
+        self.i2c_peripherals = {}
+        self.keyboard = None
+        self.consumer_control = None
+        self.lcd = None
+        self.oled = None
+        self.neopixels = []
+        # Heap as the firmware's gc module reports it, and the time in ns
+        # of each collection it asked for. Scripts add garbage to heap_used.
+        self.heap_size = 192 * 1024
+        self.heap_live = 40 * 1024
+        self.heap_used = self.heap_live
+        self.gc_enabled = True
+        self.gc_collections = []
+        self.gc_module = devices.make_gc(self)
+        self.modules = {}
+
+    # Setup
+
+    def attach_i2c(self, peripheral):
+        """Attach ``peripheral`` (with ``address``, ``write`` and ``read``) to
+        every I2C bus."""
+        self.i2c_peripherals[peripheral.address] = peripheral
+        return peripheral
+
+    def build_modules(self):
+        modules = {
+            "board": devices.make_board(self),
+            "micropython": devices.make_micropython(self),
+            "microcontroller": devices.make_microcontroller(self),
+            "supervisor": devices.make_supervisor(self),
+            "digitalio": devices.make_digitalio(self),
+            "rotaryio": devices.make_rotaryio(self),
+            "keypad": devices.make_keypad(self),
+            "busio": devices.make_busio(self),
+            "usb_hid": devices.make_usb_hid(self),
+            "neopixel": devices.make_neopixel(self),
+        }
+        bus_device, i2c_device = devices.make_adafruit_bus_device(self)
+        modules["adafruit_bus_device"] = bus_device
+        modules["adafruit_bus_device.i2c_device"] = i2c_device
+        self.modules = modules
+        return modules
+
+    def import_firmware(self, name, purge=True):
+        """Import firmware module ``name`` freshly against this hardware.
+
+        Previously imported firmware modules are dropped first unless
+        ``purge`` is false, and every firmware module loaded now sees the
+        virtual clock as ``time`` and the simulated heap as ``gc``. Calling it again on the same hardware is
+        a soft reload: the emulated peripherals keep their state.
+        """
+        for host_module in _HOST_MODULES:
+            __import__(host_module)
+        if purge:
+            for module_name, module in list(sys.modules.items()):
+                path = getattr(module, "__file__", None) or ""
+                if path.startswith((LIB + os.sep, os.path.join(ROOT, "main.py"),
+                                    os.path.join(ROOT, "keymaps.py"))):
+                    del sys.modules[module_name]
+
+        host_time = sys.modules["time"]
+        host_gc = sys.modules["gc"]
+        sys.modules["time"] = self.clock.time_module()
+        sys.modules["gc"] = self.gc_module
+        try:
+            return __import__(name)
+        finally:
+            sys.modules["time"] = host_time
+            sys.modules["gc"] = host_gc
+
+    # Scripting
+
+    def pin(self, pin):
+        return self.pins[pin.name] if not isinstance(pin, str) else self.pins[pin]
+
+    def set_pin(self, pin, level):
+        """Drive an input pin, e.g. ``False`` to close a switch to ground."""
+        self.pin(pin).level = level
+
+    def press(self, key_number, at_ms=None, scanner=0):
+        """Press a key. It is reported at the first scan at or after ``at_ms``
+        (default: now)."""
+        self._change(key_number, True, at_ms, scanner)
+
+    def release(self, key_number, at_ms=None, scanner=0):
+        self._change(key_number, False, at_ms, scanner)
+
+    def tap(self, key_number, at_ms=None, hold_ms=30, scanner=0):
+        """Press and release a key ``hold_ms`` later."""
+        at_ms = self.clock.now_ms if at_ms is None else at_ms
+        self.press(key_number, at_ms, scanner)
+        self.release(key_number, at_ms + hold_ms, scanner)
+
+    def _change(self, key_number, pressed, at_ms, scanner):
+        changes = self.scanners[scanner].changes
+        at_ns = self.clock.now_ns if at_ms is None else int(at_ms * 1000000)
+        index = len(changes)
+        while index and changes[index - 1][0] > at_ns:
+            index -= 1
+        changes.insert(index, (at_ns, key_number, pressed))
+
+    def turn(self, pin_a, detents):
+        """Turn the encoder whose A pin is ``pin_a`` by ``detents`` (signed)."""
+        self.encoders[self.pin(pin_a).name].position += detents
+
+    def run(self, scheduler, duration_ms, step_ms=1):
+        """Step ``scheduler`` through ``duration_ms`` of virtual time, calling
+        `Scheduler.run_due` every ``step_ms`` or after the previous pass if
+        it took longer."""
+        end_ms = self.clock.now_ms + duration_ms
+        while self.clock.now_ms < end_ms:
+            start_ms = self.clock.now_ms
+            scheduler.run_due(start_ms)
+            self.clock.set_ms(start_ms + step_ms)
+
+
+def install(clock=None, lcd_address=0x27, lcd_rows=2, lcd_cols=16, lcd_time_scale=1.0,
+            oled_address=None, oled_height=64):
+    """Register the fake hardware modules and return the new `Hardware`.
+
+    Calling it again replaces the previous fakes with a fresh board.
+    ``lcd_time_scale`` stretches the emulated controller's busy times.
+    With ``oled_address``, a 128 pixel wide SSD1306 is attached as well.
+    """
+    hardware = Hardware(clock)
+    for path in (ROOT, LIB):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    sys.modules.update(hardware.build_modules())
+    if lcd_address is not None:
+        hardware.lcd = hardware.attach_i2c(
+            PCF8574Backpack(hardware.clock, lcd_address, lcd_rows, lcd_cols, lcd_time_scale))
+    if oled_address is not None:
+        hardware.oled = hardware.attach_i2c(SSD1306(oled_address, 128, oled_height))
+    return hardware
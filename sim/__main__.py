@@ -0,0 +1,53 @@
+"""Boot main.py on the simulator, type a burst of keys and show the result.
+
+The burst is 20 keys pressed at once, and all 20 reports must come out in
+the same input tick.
+
+Run from the repository root::
+
+    python -m sim
+"""
+
+import sim
+
+BURST_KEYS = 20
+
+
+def main():
+    hw = sim.install()
+    main = hw.import_firmware("main")
+    boot_ms = hw.clock.now_ms
+    print("Booted in {} ms of virtual time".format(boot_ms))
+
+    # Twenty keys hit at once: their 20 press events land in the matrix
+    # queue at the same scan, and must all be reported in one input tick
+    hw.keyboard.reports.clear()
+    burst_ms = hw.clock.now_ms + 1
+    for key_number in range(BURST_KEYS):
+        hw.press(key_number, at_ms=burst_ms)
+    hw.run(main.scheduler, 50)
+
+    reports = hw.keyboard.reports
+    ticks = sorted(set(sent_ns // 1000000 for sent_ns, _ in reports))
+    print("{} keyboard reports for {} press events, in {} input tick(s); "
+          "first at +{:.3f} ms, last at +{:.3f} ms".format(
+              len(reports), BURST_KEYS, len(ticks),
+              reports[0][0] / 1e6 - burst_ms if reports else 0,
+              reports[-1][0] / 1e6 - burst_ms if reports else 0))
+    assert len(reports) == BURST_KEYS and len(ticks) == 1, "the burst was not handled in one tick"
+
+    for key_number in range(BURST_KEYS):
+        hw.release(key_number)
+    hw.run(main.scheduler, 250)
+
+    hw.turn(main.board.GP17, 4)
+    hw.run(main.scheduler, 200)
+    print("{} consumer control reports".format(len(hw.consumer_control.reports)))
+    for line in hw.lcd.lines():
+        print("|{}|".format(line))
+    bus = hw.i2c_buses[0]
+    print("I2C: {} transactions, {} bytes written".format(bus.transactions, bus.bytes_written))
+
+
+if __name__ == "__main__":
+    main()
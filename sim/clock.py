@@ -0,0 +1,62 @@
+"""Virtual clock shared by every simulated device."""
+
+import sys
+import types
+
+
+class VirtualClock:
+    """Integer-nanosecond clock that only moves when told to.
+
+    Sleeps, microsecond delays and bus transfers advance it, so timing
+    measured in the simulator is deterministic and independent of the host.
+    """
+
+    def __init__(self, start_ns=0):
+        self.now_ns = start_ns
+
+    # time module API
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def monotonic(self):
+        return self.now_ns / 1e9
+
+    def time(self):
+        return self.now_ns // 1000000000
+
+    def sleep(self, seconds):
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+        self.now_ns += int(seconds * 1e9)
+
+    # helpers for scripts
+
+    @property
+    def now_ms(self):
+        return self.now_ns // 1000000
+
+    def advance_ns(self, ns):
+        self.now_ns += int(ns)
+
+    def advance_us(self, us):
+        self.now_ns += int(us * 1000)
+
+    def advance_ms(self, ms):
+        self.now_ns += int(ms * 1000000)
+
+    def set_ms(self, ms):
+        """Move the clock forward to ``ms``. It never moves backwards."""
+        self.now_ns = max(self.now_ns, int(ms * 1000000))
+
+    def time_module(self):
+        """A stand-in for the ``time`` module that reads this clock. Anything
+        not modelled falls through to the host's ``time`` module."""
+        host_time = sys.modules["time"]
+        module = types.ModuleType("time")
+        module.monotonic = self.monotonic
+        module.monotonic_ns = self.monotonic_ns
+        module.sleep = self.sleep
+        module.time = self.time
+        module.__getattr__ = lambda name: getattr(host_time, name)
+        return module
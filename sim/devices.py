@@ -0,0 +1,485 @@
+"""Fake CircuitPython hardware modules backed by a `Hardware` instance.
+
+Each ``make_*`` function builds a module object that stands in for the
+CircuitPython module of the same name. Objects the firmware creates register
+themselves with the hardware so scripts can drive and inspect them.
+"""
+
+import types
+
+
+class Pin:
+    """A microcontroller pin. ``level`` is what the outside world drives."""
+
+    def __init__(self, name):
+        self.name = name
+        self.level = None
+
+    def __repr__(self):
+        return "board.{}".format(self.name)
+
+
+def make_board(hardware):
+    board = types.ModuleType("board")
+    for number in range(29):
+        name = "GP{}".format(number)
+        pin = Pin(name)
+        hardware.pins[name] = pin
+        setattr(board, name, pin)
+    board.LED = board.GP25
+    return board
+
+
+def make_micropython(hardware):
+    micropython = types.ModuleType("micropython")
+    micropython.const = lambda value: value
+    return micropython
+
+
+def make_microcontroller(hardware):
+    microcontroller = types.ModuleType("microcontroller")
+    microcontroller.delay_us = hardware.clock.advance_us
+    microcontroller.pin = types.SimpleNamespace(**hardware.pins)
+    return microcontroller
+
+
+def make_supervisor(hardware):
+    supervisor = types.ModuleType("supervisor")
+    supervisor.runtime = types.SimpleNamespace(usb_connected=True, serial_connected=True,
+                                               serial_bytes_available=0)
+    # supervisor.ticks_ms wraps at 2**29
+    supervisor.ticks_ms = lambda: hardware.clock.now_ms & 0x1FFFFFFF
+    return supervisor
+
+
+def make_digitalio(hardware):
+    digitalio = types.ModuleType("digitalio")
+
+    class Direction:
+        INPUT = "INPUT"
+        OUTPUT = "OUTPUT"
+
+    class Pull:
+        UP = "UP"
+        DOWN = "DOWN"
+
+    class DigitalInOut:
+        def __init__(self, pin):
+            self.pin = pin
+            self.direction = Direction.INPUT
+            self.pull = None
+            self._value = False
+
+        @property
+        def value(self):
+            if self.direction == Direction.OUTPUT:
+                return self._value
+            if self.pin.level is not None:
+                return self.pin.level
+            return self.pull == Pull.UP
+
+        @value.setter
+        def value(self, value):
+            self._value = bool(value)
+
+        def deinit(self):
+            pass
+
+    digitalio.Direction = Direction
+    digitalio.Pull = Pull
+    digitalio.DigitalInOut = DigitalInOut
+    return digitalio
+
+
+def make_rotaryio(hardware):
+    rotaryio = types.ModuleType("rotaryio")
+
+    class IncrementalEncoder:
+        def __init__(self, pin_a, pin_b, divisor=4):
+            self.pin_a = pin_a
+            self.pin_b = pin_b
+            self.divisor = divisor
+            self.position = 0
+            hardware.encoders[pin_a.name] = self
+
+        def deinit(self):
+            pass
+
+    rotaryio.IncrementalEncoder = IncrementalEncoder
+    return rotaryio
+
+
+def make_keypad(hardware):
+    keypad = types.ModuleType("keypad")
+    clock = hardware.clock
+
+    class Event:
+        def __init__(self, key_number=0, pressed=True, timestamp=None):
+            self.key_number = key_number
+            self.pressed = pressed
+            self.timestamp = clock.now_ms & 0x1FFFFFFF if timestamp is None else timestamp
+
+        @property
+        def released(self):
+            return not self.pressed
+
+        def __eq__(self, other):
+            return self.key_number == other.key_number and self.pressed == other.pressed
+
+        def __repr__(self):
+            return "<Event: key_number {} {}>".format(
+                self.key_number, "pressed" if self.pressed else "released")
+
+    class EventQueue:
+        def __init__(self, max_events):
+            self.max_events = max_events
+            self._events = []
+            self.overflowed = False
+
+        def get(self):
+            if not self._events:
+                return None
+            return self._events.pop(0)
+
+        def get_into(self, event):
+            if not self._events:
+                return False
+            queued = self._events.pop(0)
+            event.key_number = queued.key_number
+            event.pressed = queued.pressed
+            event.timestamp = queued.timestamp
+            return True
+
+        def clear(self):
+            self._events.clear()
+            self.overflowed = False
+
+        def __len__(self):
+            return len(self._events)
+
+        def __bool__(self):
+            return bool(self._events)
+
+        def _put(self, key_number, pressed, timestamp):
+            if len(self._events) >= self.max_events:
+                self.overflowed = True
+                return False
+            self._events.append(Event(key_number, pressed, timestamp))
+            return True
+
+    class _Scanner:
+        """Scans at ``interval`` seconds, lazily, whenever the queue is read.
+        Each scan samples the keys as the scripted changes have left them,
+        so a key that changes back before the next scan, e.g. contact
+        bounce, is not reported."""
+
+        def __init__(self, key_count, interval, max_events):
+            self.key_count = key_count
+            self.interval_ns = int(interval * 1e9)
+            self._events = EventQueue(max_events)
+            self._state = [False] * key_count
+            # What the switches are doing, between scans
+            self._level = [False] * key_count
+            self._last_scan_ns = clock.now_ns
+            self.changes = []
+            hardware.scanners.append(self)
+
+        @property
+        def events(self):
+            self.scan()
+            return self._events
+
+        def scan(self):
+            """Run every scan that is due by the current time."""
+            while self._last_scan_ns + self.interval_ns <= clock.now_ns:
+                self._last_scan_ns += self.interval_ns
+                timestamp = (self._last_scan_ns // 1000000) & 0x1FFFFFFF
+                while self.changes and self.changes[0][0] <= self._last_scan_ns:
+                    _, key_number, pressed = self.changes.pop(0)
+                    self._level[key_number] = pressed
+                for key_number in range(self.key_count):
+                    pressed = self._level[key_number]
+                    if self._state[key_number] != pressed:
+                        self._state[key_number] = pressed
+                        if self._events._put(key_number, pressed, timestamp):
+                            hardware.key_events.append((self._last_scan_ns, key_number, pressed))
+
+        def delay_scans(self, ns):
+            """Move every later scan ``ns`` nanoseconds later, e.g. to land
+            scans part way through the firmware's millisecond ticks."""
+            self.scan()
+            self._last_scan_ns += ns
+
+        def reset(self):
+            # Forget the debounced state so held keys are reported again at
+            # the next scan
+            self.scan()
+            self._state = [False] * self.key_count
+
+        def deinit(self):
+            hardware.scanners.remove(self)
+
+    class KeyMatrix(_Scanner):
+        def __init__(self, row_pins, column_pins, columns_to_anodes=True,
+                     interval=0.02, max_events=64):
+            self.row_pins = tuple(row_pins)
+            self.column_pins = tuple(column_pins)
+            super().__init__(len(self.row_pins) * len(self.column_pins), interval, max_events)
+
+        def key_number_to_row_column(self, key_number):
+            return divmod(key_number, len(self.column_pins))
+
+        def row_column_to_key_number(self, row, column):
+            return row * len(self.column_pins) + column
+
+    class Keys(_Scanner):
+        def __init__(self, pins, *, value_when_pressed, pull=True,
+                     interval=0.02, max_events=64):
+            self.pins = tuple(pins)
+            self.value_when_pressed = value_when_pressed
+            super().__init__(len(self.pins), interval, max_events)
+
+    keypad.Event = Event
+    keypad.EventQueue = EventQueue
+    keypad.KeyMatrix = KeyMatrix
+    keypad.Keys = Keys
+    return keypad
+
+
+def make_busio(hardware):
+    busio = types.ModuleType("busio")
+    clock = hardware.clock
+
+    class I2C:
+        """I2C bus that routes transfers to the hardware's peripherals and
+        charges the virtual clock for the bus time of each byte."""
+
+        def __init__(self, scl, sda, *, frequency=100000, timeout=255):
+            self.frequency = frequency
+            self._locked = False
+            self.transactions = 0
+            self.bytes_written = 0
+            self.bytes_read = 0
+            hardware.i2c_buses.append(self)
+
+        def try_lock(self):
+            if self._locked:
+                return False
+            self._locked = True
+            return True
+
+        def unlock(self):
+            self._locked = False
+
+        def deinit(self):
+            pass
+
+        def scan(self):
+            return sorted(hardware.i2c_peripherals)
+
+        def _peripheral(self, address):
+            try:
+                return hardware.i2c_peripherals[address]
+            except KeyError:
+                raise OSError(19) from None  # ENODEV, as on the board
+
+        def _bit_ns(self):
+            return 1e9 / self.frequency
+
+        def writeto(self, address, buffer, *, start=0, end=None):
+            data = bytes(buffer[start:end])
+            peripheral = self._peripheral(address)
+            self.transactions += 1
+            self.bytes_written += len(data)
+            # Start and address byte, then each byte with its ACK clock is
+            # delivered when it has been clocked out, then stop.
+            clock.advance_ns(10 * self._bit_ns())
+            # Peripherals that frame their protocol by transaction are told
+            # where one starts
+            begin_write = getattr(peripheral, "begin_write", None)
+            if begin_write is not None:
+                begin_write()
+            for value in data:
+                clock.advance_ns(9 * self._bit_ns())
+                peripheral.write(bytes((value,)))
+            clock.advance_ns(self._bit_ns())
+
+        def readfrom_into(self, address, buffer, *, start=0, end=None):
+            if end is None:
+                end = len(buffer)
+            peripheral = self._peripheral(address)
+            self.transactions += 1
+            self.bytes_read += end - start
+            clock.advance_ns(10 * self._bit_ns())
+            for i in range(start, end):
+                clock.advance_ns(9 * self._bit_ns())
+                buffer[i] = peripheral.read(1)[0]
+            clock.advance_ns(self._bit_ns())
+
+        def writeto_then_readfrom(self, address, buffer_out, buffer_in, *,
+                                  out_start=0, out_end=None, in_start=0, in_end=None):
+            self.writeto(address, buffer_out, start=out_start, end=out_end)
+            self.readfrom_into(address, buffer_in, start=in_start, end=in_end)
+
+    busio.I2C = I2C
+    return busio
+
+
+def make_adafruit_bus_device(hardware):
+    package = types.ModuleType("adafruit_bus_device")
+    package.__path__ = []
+    i2c_device = types.ModuleType("adafruit_bus_device.i2c_device")
+
+    class I2CDevice:
+        """Same behaviour as the core ``adafruit_bus_device.i2c_device.I2CDevice``."""
+
+        def __init__(self, i2c, device_address, probe=True):
+            self.i2c = i2c
+            self.device_address = device_address
+            if probe:
+                with self:
+                    try:
+                        self.i2c.writeto(device_address, b"")
+                    except OSError:
+                        raise ValueError("No I2C device at address: 0x%x" % device_address)
+
+        def readinto(self, buf, *, start=0, end=None):
+            self.i2c.readfrom_into(self.device_address, buf, start=start, end=end)
+
+        def write(self, buf, *, start=0, end=None):
+            self.i2c.writeto(self.device_address, buf, start=start, end=end)
+
+        def write_then_readinto(self, out_buffer, in_buffer, *, out_start=0,
+                                out_end=None, in_start=0, in_end=None):
+            self.i2c.writeto_then_readfrom(
+                self.device_address, out_buffer, in_buffer,
+                out_start=out_start, out_end=out_end, in_start=in_start, in_end=in_end)
+
+        def __enter__(self):
+            while not self.i2c.try_lock():
+                pass
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.i2c.unlock()
+            return False
+
+    i2c_device.I2CDevice = I2CDevice
+    package.i2c_device = i2c_device
+    return package, i2c_device
+
+
+def make_usb_hid(hardware):
+    usb_hid = types.ModuleType("usb_hid")
+    clock = hardware.clock
+
+    class Device:
+        """HID device that records every report with its send time in ns."""
+
+        def __init__(self, *, usage_page, usage, name=""):
+            self.usage_page = usage_page
+            self.usage = usage
+            self.name = name
+            self.reports = []
+            self.last_received_report = None
+
+        def send_report(self, report, report_id=None):
+            self.reports.append((clock.now_ns, bytes(report)))
+
+        def get_last_received_report(self, report_id=None):
+            report = self.last_received_report
+            self.last_received_report = None
+            return report
+
+    Device.KEYBOARD = Device(usage_page=0x01, usage=0x06, name="keyboard")
+    Device.MOUSE = Device(usage_page=0x01, usage=0x02, name="mouse")
+    Device.CONSUMER_CONTROL = Device(usage_page=0x0C, usage=0x01, name="consumer control")
+    usb_hid.Device = Device
+    usb_hid.devices = (Device.KEYBOARD, Device.MOUSE, Device.CONSUMER_CONTROL)
+    hardware.keyboard = Device.KEYBOARD
+    hardware.consumer_control = Device.CONSUMER_CONTROL
+    return usb_hid
+
+
+def make_neopixel(hardware):
+    neopixel = types.ModuleType("neopixel")
+    clock = hardware.clock
+
+    class NeoPixel:
+        """NeoPixel chain that records every ``show()`` with its time in ns
+        and charges the virtual clock for the time the data takes on the
+        wire, as the blocking RP2040 driver does."""
+
+        # 1.25 us per bit at 800 kHz
+        BIT_NS = 1250
+
+        def __init__(self, pin, n, *, bpp=3, brightness=1.0, auto_write=True,
+                     pixel_order=None):
+            self.pin = pin
+            self.n = n
+            self.bpp = bpp
+            self.brightness = brightness
+            self.auto_write = auto_write
+            self._pixels = [(0, 0, 0)] * n
+            # (time in ns, tuple of (r, g, b)) for every show()
+            self.frames = []
+            hardware.neopixels.append(self)
+
+        def __len__(self):
+            return self.n
+
+        def __getitem__(self, index):
+            return self._pixels[index]
+
+        def __setitem__(self, index, color):
+            if isinstance(color, int):
+                color = (color >> 16 & 0xFF, color >> 8 & 0xFF, color & 0xFF)
+            self._pixels[index] = tuple(color)
+            if self.auto_write:
+                self.show()
+
+        def fill(self, color):
+            auto_write = self.auto_write
+            self.auto_write = False
+            for i in range(self.n):
+                self[i] = color
+            self.auto_write = auto_write
+            if auto_write:
+                self.show()
+
+        def show(self):
+            clock.advance_ns(self.n * self.bpp * 8 * self.BIT_NS)
+            self.frames.append((clock.now_ns, tuple(self._pixels)))
+
+        def deinit(self):
+            hardware.neopixels.remove(self)
+
+    neopixel.NeoPixel = NeoPixel
+    return neopixel
+
+
+def make_gc(hardware):
+    """``gc`` as CircuitPython has it, with a heap of ``hardware.heap_size``
+    bytes of which ``hardware.heap_used`` are in use. A collection frees all
+    but ``hardware.heap_live`` bytes and is recorded; the host's own
+    collector is left alone."""
+    gc = types.ModuleType("gc")
+    clock = hardware.clock
+
+    def collect():
+        hardware.heap_used = hardware.heap_live
+        hardware.gc_collections.append(clock.now_ns)
+
+    def enable():
+        hardware.gc_enabled = True
+
+    def disable():
+        hardware.gc_enabled = False
+
+    gc.collect = collect
+    gc.enable = enable
+    gc.disable = disable
+    gc.isenabled = lambda: hardware.gc_enabled
+    gc.mem_alloc = lambda: hardware.heap_used
+    gc.mem_free = lambda: hardware.heap_size - hardware.heap_used
+    return gc
@@ -0,0 +1,226 @@
+"""Emulated PCF8574 I2C backpack driving an HD44780 character LCD in 4-bit mode."""
+
+# PCF8574 pin bitmasks, as wired on the common LCD backpacks
+_RS = 0x01
+_RW = 0x02
+_EN = 0x04
+_BL = 0x08
+
+# HD44780 execution times in nanoseconds (datasheet, 270 kHz oscillator)
+CLEAR_HOME_NS = 1520000
+COMMAND_NS = 37000
+DATA_NS = 41000
+
+_DDRAM_LINE_LENGTH = 40
+
+
+class HD44780:
+    """HD44780 controller state: DDRAM, CGRAM, address counter and modes.
+
+    ``time_scale`` stretches the execution times, e.g. 1.5 for a controller
+    whose oscillator runs slow.
+    """
+
+    def __init__(self, clock, num_rows=2, num_cols=16, time_scale=1.0):
+        self.clock = clock
+        self.time_scale = time_scale
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.ddram = bytearray(b" " * 0x80)
+        self.cgram = bytearray(0x40)
+        self.address = 0
+        self.in_cgram = False
+        self.increment = True
+        self.entry_shift = False
+        self.display_on = False
+        self.cursor_on = False
+        self.blink_on = False
+        self.eight_bit = True
+        self.two_line = False
+        self.shift = 0
+        self.busy_until_ns = 0
+
+        self.instructions = 0
+        self.data_writes = 0
+        self.busy_violations = 0
+
+    @property
+    def busy(self):
+        return self.clock.now_ns < self.busy_until_ns
+
+    def execute(self, value, rs):
+        """Execute one full 8-bit instruction (``rs`` false) or data write."""
+        if self.busy:
+            self.busy_violations += 1
+        if rs:
+            self.data_writes += 1
+            self._write_data(value)
+            duration = DATA_NS
+        else:
+            self.instructions += 1
+            duration = self._instruction(value)
+        self.busy_until_ns = self.clock.now_ns + int(duration * self.time_scale)
+
+    def status(self):
+        """The busy flag (bit 7) and address counter, as read with RS low."""
+        return (0x80 if self.busy else 0) | self.address
+
+    def read_data(self):
+        """Read the byte at the address counter from DDRAM or CGRAM and step
+        the counter, as a data read with RS high does."""
+        value = self.cgram[self.address] if self.in_cgram else self.ddram[self.address]
+        self._step_address(self.increment)
+        return value
+
+    def _instruction(self, value):
+        if value & 0x80:
+            self.in_cgram = False
+            self.address = value & 0x7F
+        elif value & 0x40:
+            self.in_cgram = True
+            self.address = value & 0x3F
+        elif value & 0x20:
+            self.eight_bit = bool(value & 0x10)
+            self.two_line = bool(value & 0x08)
+        elif value & 0x10:
+            right = bool(value & 0x04)
+            if value & 0x08:
+                self.shift = (self.shift + (-1 if right else 1)) % _DDRAM_LINE_LENGTH
+            else:
+                self._step_address(right)
+        elif value & 0x08:
+            self.display_on = bool(value & 0x04)
+            self.cursor_on = bool(value & 0x02)
+            self.blink_on = bool(value & 0x01)
+        elif value & 0x04:
+            self.increment = bool(value & 0x02)
+            self.entry_shift = bool(value & 0x01)
+        elif value & 0x02:
+            self.in_cgram = False
+            self.address = 0
+            self.shift = 0
+            return CLEAR_HOME_NS
+        elif value & 0x01:
+            self.ddram[:] = b" " * 0x80
+            self.in_cgram = False
+            self.address = 0
+            self.shift = 0
+            self.increment = True
+            return CLEAR_HOME_NS
+        return COMMAND_NS
+
+    def _write_data(self, value):
+        if self.in_cgram:
+            self.cgram[self.address] = value
+        else:
+            self.ddram[self.address] = value
+            if self.entry_shift:
+                self.shift = (self.shift + (1 if self.increment else -1)) % _DDRAM_LINE_LENGTH
+        self._step_address(self.increment)
+
+    def _step_address(self, forward):
+        if self.in_cgram:
+            self.address = (self.address + (1 if forward else -1)) & 0x3F
+        elif self.two_line:
+            # Two separate 40-byte lines at 0x00 and 0x40 that wrap into each other
+            line, offset = self.address & 0x40, self.address & 0x3F
+            offset += 1 if forward else -1
+            if offset >= _DDRAM_LINE_LENGTH:
+                line, offset = line ^ 0x40, 0
+            elif offset < 0:
+                line, offset = line ^ 0x40, _DDRAM_LINE_LENGTH - 1
+            self.address = line | offset
+        else:
+            self.address = (self.address + (1 if forward else -1)) % 80
+
+    def lines(self):
+        """The visible screen as a list of strings, one per row."""
+        rows = []
+        for row in range(self.num_rows):
+            base = (0x00, 0x40, self.num_cols, 0x40 + self.num_cols)[row]
+            line = base & 0x40
+            start = base & 0x3F
+            rows.append("".join(
+                chr(self.ddram[line | (start + col + self.shift) % _DDRAM_LINE_LENGTH])
+                for col in range(self.num_cols)))
+        return rows
+
+
+class PCF8574Backpack:
+    """PCF8574 port expander wired to an `HD44780`.
+
+    Decodes the enable pulses written over I2C into nibbles and feeds them
+    to the controller, tracking 8-bit/4-bit interface mode. With RW high,
+    the controller drives D7-D4 with the busy flag and address counter
+    (RS low) or the RAM byte at the address counter (RS high) while enable
+    is high, one nibble per enable pulse.
+    """
+
+    def __init__(self, clock, address=0x27, num_rows=2, num_cols=16, time_scale=1.0):
+        self.address = address
+        self.controller = HD44780(clock, num_rows=num_rows, num_cols=num_cols,
+                                  time_scale=time_scale)
+        self.port = 0xFF
+        self.nibbles = 0
+        self.reads = 0
+        self._high_nibble = None
+        self._read_nibble = None
+        self._read_value = 0
+        self._read_low = False
+
+    @property
+    def backlight(self):
+        return bool(self.port & _BL)
+
+    def lines(self):
+        return self.controller.lines()
+
+    def write(self, data):
+        """Handle bytes written to the expander, one port update per byte."""
+        for value in data:
+            previous = self.port
+            self.port = value
+            if previous & _EN and not value & _EN and not previous & _RW:
+                # Falling edge of enable latches the data pins
+                self._nibble(previous >> 4, previous & _RS)
+            elif value & _EN and not previous & _EN and value & _RW:
+                # Rising edge of enable with RW high: controller drives D7-D4
+                self._start_read(value & _RS)
+            if not value & _EN:
+                self._read_nibble = None
+
+    def read(self, count):
+        """Read the port ``count`` times. Pins written high are inputs and
+        can be pulled low by the controller (quasi-bidirectional port)."""
+        value = self.port
+        if self._read_nibble is not None:
+            value &= 0x0F | self._read_nibble << 4
+        return bytes([value] * count)
+
+    def _start_read(self, rs):
+        self.reads += 1
+        controller = self.controller
+        if self._read_low and not controller.eight_bit:
+            # Second half of a 4-bit read: the byte latched by the first pulse
+            self._read_nibble = self._read_value & 0x0F
+            self._read_low = False
+            return
+        # A data read steps the address counter once per byte
+        value = controller.read_data() if rs else controller.status()
+        self._read_value = value
+        self._read_nibble = value >> 4
+        self._read_low = not controller.eight_bit
+
+    def _nibble(self, nibble, rs):
+        self.nibbles += 1
+        controller = self.controller
+        if controller.eight_bit:
+            # Only D7-D4 are wired, so the low half of the bus reads as zero
+            self._high_nibble = None
+            controller.execute(nibble << 4, rs)
+        elif self._high_nibble is None:
+            self._high_nibble = nibble
+        else:
+            value = self._high_nibble << 4 | nibble
+            self._high_nibble = None
+            controller.execute(value, rs)
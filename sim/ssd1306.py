@@ -0,0 +1,92 @@
+"""Emulated SSD1306 OLED controller on I2C."""
+
+# Control bytes that start an I2C transaction
+_COMMANDS = 0x00
+_DATA = 0x40
+
+# Commands with arguments, by number of argument bytes
+_ARGUMENTS = {
+    0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1,
+    0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1,
+}
+
+
+class SSD1306:
+    """SSD1306 with its 128xN graphics RAM, in horizontal addressing mode.
+
+    Only what the firmware uses is modelled: command and data streams,
+    the column and page address windows, display on/off and the pointer
+    that walks through the window as data is written.
+    """
+
+    def __init__(self, address=0x3C, width=128, height=64):
+        self.address = address
+        self.width = width
+        self.pages = height // 8
+        self.gddram = bytearray(width * self.pages)
+        self.display_on = False
+        self.horizontal = False
+        self.column_window = (0, width - 1)
+        self.page_window = (0, self.pages - 1)
+        self.column = 0
+        self.page = 0
+
+        self._control = None
+        self._pending = []
+
+        self.commands = 0
+        self.data_bytes = 0
+
+    def begin_write(self):
+        """Start of an I2C write: the next byte is a control byte."""
+        self._control = None
+        self._pending = []
+
+    def write(self, data):
+        """Handle bytes of the current write transaction."""
+        for value in data:
+            if self._control is None:
+                self._control = value
+            elif self._control == _DATA:
+                self._write_data(value)
+            elif self._control == _COMMANDS:
+                self._pending.append(value)
+                if len(self._pending) == 1 + _ARGUMENTS.get(self._pending[0], 0):
+                    self._command(self._pending[0], self._pending[1:])
+                    self._pending = []
+
+    def read(self, count):
+        return bytes(count)
+
+    def _command(self, command, arguments):
+        self.commands += 1
+        if command == 0x20:
+            self.horizontal = arguments[0] == 0x00
+        elif command == 0x21:
+            self.column_window = (arguments[0], arguments[1])
+            self.column = arguments[0]
+        elif command == 0x22:
+            self.page_window = (arguments[0], arguments[1])
+            self.page = arguments[0]
+        elif command in (0xAE, 0xAF):
+            self.display_on = command == 0xAF
+
+    def _write_data(self, value):
+        self.data_bytes += 1
+        self.gddram[self.page * self.width + self.column] = value
+        first_column, last_column = self.column_window
+        if self.column < last_column:
+            self.column += 1
+            return
+        self.column = first_column
+        if self.horizontal:
+            first_page, last_page = self.page_window
+            self.page = self.page + 1 if self.page < last_page else first_page
+
+    def pixel(self, x, y):
+        return bool(self.gddram[(y // 8) * self.width + x] >> (y % 8) & 1)
+
+    def dump(self):
+        """The screen as text, '#' for a lit pixel."""
+        return ["".join("#" if self.pixel(x, y) else "." for x in range(self.width))
+                for y in range(self.pages * 8)]